@@ -5,9 +5,9 @@ Saves to byd_escapism schema
 """
 
 import logging
-from config.cities_config import CITIES
+from config.cities_config import CITIES, CITIES_BY_COUNTRY
 from sources.wikidata import WikidataCollector
-from utils.database import Database
+from utils.database import get_database
 from utils.llm import LocalLLM
 
 # Setup logging
@@ -20,14 +20,13 @@ logger = logging.getLogger(__name__)
 class AzerbaijanDestinationCollector:
     def __init__(self):
         self.wikidata = WikidataCollector()
-        self.db = Database(schema='byd_escapism')
+        self.db = get_database('byd_escapism')
         self.llm = LocalLLM()
         
     def collect_all_azerbaijan(self):
         """Collect all Azerbaijan destinations"""
         azerbaijan_cities = [
-            (key, config) for key, config in CITIES.items() 
-            if config['country'] == 'Azerbaijan'
+            (city.key, CITIES[city.key]) for city in CITIES_BY_COUNTRY.get('Azerbaijan', ())
         ]
         
         logger.info(f"Found {len(azerbaijan_cities)} Azerbaijan destinations to collect")
@@ -3,7 +3,7 @@ import argparse
 import json
 from typing import List, Dict
 from sources.wikidata import WikidataCollector
-from utils.database import Database
+from utils.database import get_database
 from utils.llm import LocalLLM
 from main import CITIES
 
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 class DestinationCollector:
     def __init__(self):
         self.wikidata = WikidataCollector()
-        self.db = Database(schema='byd_escapism')
+        self.db = get_database('byd_escapism')
         self.llm = LocalLLM()
 
     def collect_all(self):
@@ -3,7 +3,7 @@
 Re-enrich Baku destination with comprehensive tourism data
 """
 
-from utils.database import Database
+from utils.database import get_database
 from utils.llm import LocalLLM
 import logging
 
@@ -13,7 +13,7 @@ logger = logging.getLogger(__name__)
 def enrich_baku():
     """Enrich Baku with comprehensive tourism information"""
     
-    db = Database(schema='byd_escapism')
+    db = get_database('byd_escapism')
     llm = LocalLLM()
     
     # Comprehensive Baku data
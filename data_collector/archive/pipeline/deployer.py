@@ -2,7 +2,7 @@ import logging
 import json
 from pathlib import Path
 from typing import Dict, List
-from utils.database import Database
+from utils.database import get_database
 from config.cities_config import CITIES
 
 logger = logging.getLogger(__name__)
@@ -14,9 +14,9 @@ class Deployer:
     
     def __init__(self):
         # Source: Staging Schema
-        self.staging_db = Database(schema="byd_escapism")
+        self.staging_db = get_database("byd_escapism")
         # Target: Production Schema
-        self.prod_db = Database(schema="public")
+        self.prod_db = get_database("public")
         
         self.processed_data_dir = Path("processed_data")
 
@@ -114,12 +114,9 @@ class Processor:
                     if poi:
                         poi['city_name'] = city_name
                         # Lookup country from config if possible, else default
-                        from config.cities_config import CITIES
-                        country = "Unknown"
-                        for key, cdata in CITIES.items():
-                            if cdata['name'].lower() == city_name.lower():
-                                country = cdata['country']
-                                break
+                        from config.cities_config import CITIES, CITY_KEY_BY_NAME
+                        city_key = CITY_KEY_BY_NAME.get(city_name.lower())
+                        country = CITIES[city_key]['country'] if city_key else "Unknown"
                         poi['country_code'] = country
                         
                         clean_pois.append(poi)
@@ -2,10 +2,10 @@
 """
 Review current Azerbaijan destination data
 """
-from utils.database import Database
+from utils.database import get_database
 import json
 
-db = Database(schema='byd_escapism')
+db = get_database('byd_escapism')
 result = db.client.table('destinations').select('*').eq('country', 'Azerbaijan').order('name').execute()
 
 print('='*70)
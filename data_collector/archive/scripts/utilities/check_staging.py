@@ -1,7 +1,7 @@
-from utils.database import Database
+from utils.database import get_database
 
 def check_staging():
-    db = Database(schema='byd_escapism')
+    db = get_database('byd_escapism')
     print("Connected to byd_escapism")
     
     dests = db.client.table('destinations').select('*').execute().data
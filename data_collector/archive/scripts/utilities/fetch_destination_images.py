@@ -2,13 +2,16 @@
 Fetch real images from Wikimedia Commons for destinations without images
 """
 import sys
-sys.path.append('/Users/alokanand/AllInOne/BeyondEscapism/BeyondEscapism/data_collector')
+from pathlib import Path
 
-from utils.database import Database
+# data_collector/ is three levels above archive/scripts/utilities/
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from utils.database import get_database
 from sources.wikidata import WikidataCollector
 import time
 
-db = Database(schema='public')
+db = get_database('public')
 wikidata = WikidataCollector()
 
 # Destinations without images (from analysis)
@@ -15,7 +15,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from utils.database import Database
+from utils.database import get_database
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,7 +24,7 @@ class EnhancedPOILoader:
     """Loads enriched POIs to byd_escapism.pois with proper schema mapping"""
     
     def __init__(self):
-        self.db = Database(schema='byd_escapism')
+        self.db = get_database('byd_escapism')
     
     def map_poi_to_schema(self, poi: Dict, city_name: str) -> Dict:
         """Map our POI structure to byd_escapism.pois schema"""
@@ -3,9 +3,12 @@ Manual Data Enrichment Script
 Adds vibe_tags and best_time_to_visit to existing destinations in public schema
 """
 import sys
-sys.path.append('/Users/alokanand/AllInOne/BeyondEscapism/BeyondEscapism/data_collector')
+from pathlib import Path
 
-from utils.database import Database
+# data_collector/ is three levels above archive/scripts/utilities/
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from utils.database import get_database
 
 # Destination enrichment data
 DESTINATION_DATA = {
@@ -128,12 +131,14 @@ DESTINATION_DATA = {
 
 def enrich_destinations():
     """Update destinations in public schema with enriched data"""
-    db = Database(schema='public')
+    db = get_database('public')
     
     print("🔧 Starting manual data enrichment...\n")
     
-    updated_count = 0
+    # Collect outcomes and report once at the end instead of printing per row
+    updated = []
     not_found = []
+    errors = []
     
     for dest_name, enrichment in DESTINATION_DATA.items():
         try:
@@ -150,20 +155,26 @@ def enrich_destinations():
                     'category_tags': enrichment['category_tags']
                 }).eq('id', dest_id).execute()
                 
-                print(f"✅ Updated {dest_name}")
-                updated_count += 1
+                updated.append(dest_name)
             else:
                 not_found.append(dest_name)
-                print(f"⚠️  Not found: {dest_name}")
                 
         except Exception as e:
-            print(f"❌ Error updating {dest_name}: {e}")
+            errors.append((dest_name, str(e)))
     
-    print(f"\n📊 Summary:")
-    print(f"   Updated: {updated_count}")
-    print(f"   Not found: {len(not_found)}")
+    lines = [
+        "📊 Summary:",
+        f"   Updated: {len(updated)}",
+        f"   Not found: {len(not_found)}",
+        f"   Errors: {len(errors)}",
+    ]
+    if updated:
+        lines.append(f"   ✅ Updated: {', '.join(updated)}")
     if not_found:
-        print(f"   Missing: {', '.join(not_found)}")
+        lines.append(f"   ⚠️  Missing: {', '.join(not_found)}")
+    for dest_name, error in errors:
+        lines.append(f"   ❌ {dest_name}: {error}")
+    print("\n".join(lines))
 
 if __name__ == "__main__":
     enrich_destinations()
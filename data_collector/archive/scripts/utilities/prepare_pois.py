@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+POI Preparation Pipeline
+Prioritizes and quality-checks POIs in a single pass, without writing the
+intermediate *_prioritized.json file between the two steps
+"""
+
+import logging
+from typing import List, Dict, Optional, Tuple
+import argparse
+
+from prioritize_pois import POIPrioritizer, load_pois, save_pois
+from quality_check_pois import POIQualityChecker
+
+logger = logging.getLogger(__name__)
+
+def run_pipeline(
+    pois: List[Dict],
+    prioritizer: Optional[POIPrioritizer] = None,
+    checker: Optional[POIQualityChecker] = None
+) -> Tuple[List[Dict], Dict]:
+    """
+    Score, tier and validate POIs in one traversal
+
+    Returns:
+        (valid_pois sorted by priority, quality_report)
+    """
+    prioritizer = prioritizer or POIPrioritizer()
+    checker = checker or POIQualityChecker()
+
+    scored = (prioritizer.prioritize_poi(poi) for poi in pois)
+    valid_pois, report = checker.validate_pois(scored)
+
+    # Sort by priority score (highest first)
+    valid_pois.sort(key=lambda x: x['priority_score'], reverse=True)
+
+    return valid_pois, report
+
+def main():
+    parser = argparse.ArgumentParser(description='Prioritize and validate POIs in one pass')
+    parser.add_argument('--city', required=True, help='City name (e.g., Baku)')
+    parser.add_argument('--input', help='Input file (default: processed_data/{city}_pois.json)')
+    parser.add_argument('--output', help='Output file (default: processed_data/{city}_pois_prioritized.json)')
+    parser.add_argument('--top', type=int, default=50, help='Number of top POIs to display')
+    parser.add_argument('--min-score', type=int, default=60, help='Minimum quality score to pass (default: 60)')
+    parser.add_argument('--ndjson', action='store_true', help='Write output as newline-delimited JSON (one POI per line)')
+
+    args = parser.parse_args()
+
+    # Determine file paths
+    city_lower = args.city.lower().replace(' ', '_')
+    input_file = args.input or f'processed_data/{city_lower}_pois.json'
+    output_ext = 'jsonl' if args.ndjson else 'json'
+    output_file = args.output or f'processed_data/{city_lower}_pois_prioritized.{output_ext}'
+
+    # Load POIs
+    logger.info(f"Loading POIs from {input_file}...")
+    pois = load_pois(input_file)
+
+    # Prioritize + validate
+    prioritizer = POIPrioritizer()
+    checker = POIQualityChecker()
+    valid_pois, report = run_pipeline(pois, prioritizer, checker)
+
+    # Save
+    logger.info(f"\nSaving {len(valid_pois)} valid POIs to {output_file}...")
+    save_pois(valid_pois, output_file, ndjson=args.ndjson)
+
+    # Print statistics
+    prioritizer.print_stats()
+    prioritizer.print_top_pois(valid_pois, args.top)
+    checker.print_report(report)
+
+    # Exit with appropriate code
+    if report['quality_score'] < args.min_score:
+        logger.error(f"\n❌ Quality score {report['quality_score']} is below minimum {args.min_score}")
+        exit(1)
+
+    logger.info(f"\n✅ POIs prioritized and validated! Score: {report['quality_score']}/100")
+    exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Scores and ranks POIs by tourism importance for intelligent enrichment
 
 import json
 import logging
+from collections import Counter
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict
 import argparse
@@ -13,103 +15,131 @@ import argparse
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# POI Type Weights (out of 40 points)
+POI_TYPE_WEIGHTS = {
+    'museum': 40,
+    'historic': 38,
+    'viewpoint': 35,
+    'temple': 33,
+    'park': 30,
+    'market': 28,
+    'monument': 25,
+    'beach': 25,
+    'attraction': 35,
+    'castle': 38,
+    'gallery': 35,
+    'zoo': 30,
+    'aquarium': 30,
+    'theme_park': 28,
+    'restaurant': 10,  # Generic restaurants
+    'cafe': 8,
+    'hotel': 15,
+    'shop': 5,
+    'service': 3,
+}
+
+# Special keywords that boost priority
+IMPORTANCE_KEYWORDS = {
+    'unesco': 20,
+    'world heritage': 20,
+    'national': 15,
+    'state': 15,
+    'famous': 10,
+    'popular': 10,
+    'old': 8,
+    'ancient': 8,
+    'historic': 8,
+    'museum': 5,
+    'gallery': 5,
+    'palace': 12,
+    'tower': 10,
+    'cathedral': 10,
+    'mosque': 10,
+    'synagogue': 10,
+    'church': 8,
+}
+
+# OSM tags that signal a well-documented POI (20 points). Alternative keys
+# share a group so e.g. website + contact:website only count once.
+_SCORING_TAG_GROUPS = {
+    'description': 'description',
+    'opening_hours': 'opening_hours',
+    'website': 'website',
+    'contact:website': 'website',
+    'phone': 'phone',
+    'contact:phone': 'phone',
+    'wikipedia': 'wiki',
+    'wikidata': 'wiki',
+}
+_SCORING_GROUP_SCORES = {
+    'description': 5,
+    'opening_hours': 5,
+    'website': 5,
+    'phone': 3,
+    'wiki': 2,
+}
+_SCORING_TAG_KEYS = frozenset(_SCORING_TAG_GROUPS)
+
+# Tag values scanned for IMPORTANCE_KEYWORDS (keys and the rest of the tag
+# dict are ignored so e.g. a "website" key can't produce a match)
+_KEYWORD_SCAN_TAGS = ('description', 'heritage', 'historic', 'tourism', 'name:en', 'alt_name')
+
 class POIPrioritizer:
     """Scores and prioritizes POIs for tourism/itinerary planning"""
     
-    # POI Type Weights (out of 40 points)
-    POI_TYPE_WEIGHTS = {
-        'museum': 40,
-        'historic': 38,
-        'viewpoint': 35,
-        'temple': 33,
-        'park': 30,
-        'market': 28,
-        'monument': 25,
-        'beach': 25,
-        'attraction': 35,
-        'castle': 38,
-        'gallery': 35,
-        'zoo': 30,
-        'aquarium': 30,
-        'theme_park': 28,
-        'restaurant': 10,  # Generic restaurants
-        'cafe': 8,
-        'hotel': 15,
-        'shop': 5,
-        'service': 3,
-    }
-    
-    # Special keywords that boost priority
-    IMPORTANCE_KEYWORDS = {
-        'unesco': 20,
-        'world heritage': 20,
-        'national': 15,
-        'state': 15,
-        'famous': 10,
-        'popular': 10,
-        'old': 8,
-        'ancient': 8,
-        'historic': 8,
-        'museum': 5,
-        'gallery': 5,
-        'palace': 12,
-        'tower': 10,
-        'cathedral': 10,
-        'mosque': 10,
-        'synagogue': 10,
-        'church': 8,
-    }
+    __slots__ = ('stats',)
+    
+    # Kept on the class for callers that read POIPrioritizer.POI_TYPE_WEIGHTS
+    POI_TYPE_WEIGHTS = POI_TYPE_WEIGHTS
+    IMPORTANCE_KEYWORDS = IMPORTANCE_KEYWORDS
     
     def __init__(self):
-        self.stats = {
+        self.stats = Counter({
             'total_pois': 0,
             'essential': 0,
             'important': 0,
             'recommended': 0,
             'optional': 0,
             'low_priority': 0
-        }
+        })
     
     def score_poi(self, poi: Dict) -> int:
         """Calculate priority score for a POI (0-100)"""
+        weights = POI_TYPE_WEIGHTS
+        keywords = IMPORTANCE_KEYWORDS
         score = 0
         
         # 1. POI Type Weight (40 points)
         poi_type = poi.get('poi_type', '').lower()
-        score += self.POI_TYPE_WEIGHTS.get(poi_type, 5)
+        score += weights.get(poi_type, 5)
         
         # 2. Name Quality (20 points)
         name = poi.get('name', '')
         name_local = poi.get('name_local', '')
         
-        if name and len(name) > 5:
+        name_len = len(name)
+        if name_len > 10:
+            score += 15  # Meaningful English name; longer names often indicate importance
+        elif name_len > 5:
             score += 10  # Has meaningful English name
         if name_local and name_local != name:
             score += 5  # Has local name
-        if len(name) > 10:
-            score += 5  # Longer names often indicate importance
         
         # 3. OSM Tags Richness (20 points)
         metadata = poi.get('metadata', {})
         osm_tags = metadata.get('osm_tags', {})
         
-        if osm_tags.get('description'):
-            score += 5
-        if osm_tags.get('opening_hours'):
-            score += 5
-        if osm_tags.get('website') or osm_tags.get('contact:website'):
-            score += 5
-        if osm_tags.get('phone') or osm_tags.get('contact:phone'):
-            score += 3
-        if osm_tags.get('wikipedia') or osm_tags.get('wikidata'):
-            score += 2
+        present = {_SCORING_TAG_GROUPS[k] for k in osm_tags.keys() & _SCORING_TAG_KEYS if osm_tags[k]}
+        score += sum(_SCORING_GROUP_SCORES[g] for g in present)
         
         # 4. Category Importance (20 points)
-        # Check for special keywords in name and tags
-        search_text = f"{name} {name_local} {str(osm_tags)}".lower()
+        # Check for special keywords in the name and descriptive tag values
+        search_text = ' '.join(filter(None, (
+            name, name_local, *(osm_tags.get(k) for k in _KEYWORD_SCAN_TAGS)
+        ))).lower()
         
         keyword_bonus = 0
-        for keyword, bonus in self.IMPORTANCE_KEYWORDS.items():
+        for keyword, bonus in keywords.items():
             if keyword in search_text:
                 keyword_bonus = max(keyword_bonus, bonus)  # Take highest match
         
@@ -142,28 +172,33 @@ class POIPrioritizer:
         }
         return tier_priority.get(tier, 5)
     
+    def prioritize_poi(self, poi: Dict) -> Dict:
+        """Score a single POI in place and record its tier"""
+        # Calculate score
+        score = self.score_poi(poi)
+        tier = self.get_priority_tier(score)
+        enrichment_priority = self.get_enrichment_priority(tier)
+        
+        # Add priority fields
+        poi['priority_score'] = score
+        poi['priority_tier'] = tier
+        poi['enrichment_priority'] = enrichment_priority
+        
+        # Update stats
+        self.stats['total_pois'] += 1
+        self.stats[tier] += 1
+        
+        return poi
+    
     def prioritize_pois(self, pois: List[Dict]) -> List[Dict]:
         """Score and prioritize all POIs"""
         logger.info(f"Prioritizing {len(pois)} POIs...")
         
-        self.stats['total_pois'] = len(pois)
-        
         for poi in pois:
-            # Calculate score
-            score = self.score_poi(poi)
-            tier = self.get_priority_tier(score)
-            enrichment_priority = self.get_enrichment_priority(tier)
-            
-            # Add priority fields
-            poi['priority_score'] = score
-            poi['priority_tier'] = tier
-            poi['enrichment_priority'] = enrichment_priority
-            
-            # Update stats
-            self.stats[tier] = self.stats.get(tier, 0) + 1
+            self.prioritize_poi(poi)
         
         # Sort by priority score (highest first)
-        pois_sorted = sorted(pois, key=lambda x: x['priority_score'], reverse=True)
+        pois_sorted = sorted(pois, key=itemgetter('priority_score'), reverse=True)
         
         return pois_sorted
     
@@ -182,7 +217,7 @@ class POIPrioritizer:
         logger.info("="*70)
     
     def print_top_pois(self, pois: List[Dict], count: int = 50):
-        """Print top N POIs for verification"""
+        """Print the first N of pois, which callers have already sorted by priority, for verification"""
         logger.info(f"\n{'='*70}")
         logger.info(f"TOP {count} HIGHEST PRIORITY POIs")
         logger.info(f"{'='*70}\n")
@@ -192,24 +227,48 @@ class POIPrioritizer:
             if poi['priority_tier'] == 'essential':
                 logger.info(f"    ⭐ ESSENTIAL - Must enrich")
 
+def save_pois(pois: List[Dict], output_file: str, ndjson: bool = False):
+    """Stream POIs to disk one at a time instead of serializing the whole list"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if ndjson:
+            for poi in pois:
+                f.write(json.dumps(poi, ensure_ascii=False))
+                f.write('\n')
+            return
+        
+        f.write('[\n')
+        for i, poi in enumerate(pois):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(poi, ensure_ascii=False))
+        f.write('\n]\n')
+
+def load_pois(input_file: str) -> List[Dict]:
+    """Load POIs from a JSON array or NDJSON (.jsonl/.ndjson) file"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        if input_file.endswith(('.jsonl', '.ndjson')):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
 def main():
     parser = argparse.ArgumentParser(description='Prioritize POIs by tourism importance')
     parser.add_argument('--city', required=True, help='City name (e.g., Baku)')
     parser.add_argument('--input', help='Input file (default: processed_data/{city}_pois.json)')
     parser.add_argument('--output', help='Output file (default: processed_data/{city}_pois_prioritized.json)')
     parser.add_argument('--top', type=int, default=50, help='Number of top POIs to display')
+    parser.add_argument('--ndjson', action='store_true', help='Write output as newline-delimited JSON (one POI per line)')
     
     args = parser.parse_args()
     
     # Determine file paths
     city_lower = args.city.lower().replace(' ', '_')
     input_file = args.input or f'processed_data/{city_lower}_pois.json'
-    output_file = args.output or f'processed_data/{city_lower}_pois_prioritized.json'
+    output_ext = 'jsonl' if args.ndjson else 'json'
+    output_file = args.output or f'processed_data/{city_lower}_pois_prioritized.{output_ext}'
     
     # Load POIs
     logger.info(f"Loading POIs from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        pois = json.load(f)
+    pois = load_pois(input_file)
     
     # Prioritize
     prioritizer = POIPrioritizer()
@@ -217,8 +276,7 @@ def main():
     
     # Save
     logger.info(f"\nSaving prioritized POIs to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(pois_prioritized, f, ensure_ascii=False, indent=2)
+    save_pois(pois_prioritized, output_file, ndjson=args.ndjson)
     
     # Print statistics
     prioritizer.print_stats()
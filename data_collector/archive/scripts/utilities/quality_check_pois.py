@@ -4,18 +4,21 @@ Data Quality Checker for POIs
 Validates enriched POI data before database loading
 """
 
-import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterable, Tuple
 import argparse
 
+from prioritize_pois import load_pois, save_pois
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class POIQualityChecker:
     """Validates POI data quality before database loading"""
     
+    __slots__ = ('issues', 'warnings', 'stats')
+    
     def __init__(self):
         self.issues = []
         self.warnings = []
@@ -91,44 +94,39 @@ class POIQualityChecker:
         
         return warnings
     
-    def check_duplicates(self, pois: List[Dict]) -> List[str]:
-        """Check for duplicate OSM IDs"""
-        issues = []
-        osm_ids = {}
-        
-        for i, poi in enumerate(pois):
-            osm_id = poi.get('osm_id')
-            if osm_id in osm_ids:
-                issues.append(f"Duplicate OSM ID: {osm_id} (indices {osm_ids[osm_id]} and {i})")
-            else:
-                osm_ids[osm_id] = i
-        
-        return issues
-    
-    def validate_pois(self, pois: List[Dict]) -> Tuple[List[Dict], Dict]:
+    def validate_pois(self, pois: Iterable[Dict]) -> Tuple[List[Dict], Dict]:
         """
         Validate all POIs and return valid ones with quality report
         
+        Accepts any iterable, so scored POIs can be streamed straight in
+        from POIPrioritizer without an intermediate list or file.
+        
         Returns:
             (valid_pois, quality_report)
         """
-        logger.info(f"Validating {len(pois)} POIs...")
+        if isinstance(pois, list):
+            logger.info(f"Validating {len(pois)} POIs...")
+        else:
+            logger.info("Validating POIs...")
         
-        self.stats['total_pois'] = len(pois)
         valid_pois = []
-        
-        # Check for duplicates
-        duplicate_issues = self.check_duplicates(pois)
-        if duplicate_issues:
-            self.stats['duplicate_osm_ids'] = len(duplicate_issues)
-            for issue in duplicate_issues:
-                self.issues.append(f"DUPLICATE: {issue}")
+        duplicate_issues = []
+        poi_issues_log = []
+        osm_ids = {}
         
         # Validate each POI
         for i, poi in enumerate(pois):
+            self.stats['total_pois'] += 1
             poi_issues = []
             poi_warnings = []
             
+            # Check for duplicates
+            osm_id = poi.get('osm_id')
+            if osm_id in osm_ids:
+                duplicate_issues.append(f"Duplicate OSM ID: {osm_id} (indices {osm_ids[osm_id]} and {i})")
+            else:
+                osm_ids[osm_id] = i
+            
             # Check required fields
             field_issues = self.check_required_fields(poi)
             poi_issues.extend(field_issues)
@@ -156,7 +154,7 @@ class POIQualityChecker:
             if poi_issues:
                 self.stats['invalid_pois'] += 1
                 for issue in poi_issues:
-                    self.issues.append(f"POI #{i} ({poi.get('name', 'UNKNOWN')}): {issue}")
+                    poi_issues_log.append(f"POI #{i} ({poi.get('name', 'UNKNOWN')}): {issue}")
             else:
                 self.stats['valid_pois'] += 1
                 valid_pois.append(poi)
@@ -165,6 +163,13 @@ class POIQualityChecker:
                 for warning in poi_warnings:
                     self.warnings.append(f"POI #{i} ({poi.get('name', 'UNKNOWN')}): {warning}")
         
+        # Duplicates are reported ahead of per-POI issues
+        if duplicate_issues:
+            self.stats['duplicate_osm_ids'] = len(duplicate_issues)
+            for issue in duplicate_issues:
+                self.issues.append(f"DUPLICATE: {issue}")
+        self.issues.extend(poi_issues_log)
+        
         return valid_pois, self.generate_report()
     
     def generate_report(self) -> Dict:
@@ -254,8 +259,7 @@ def main():
     
     # Load POIs
     logger.info(f"Loading POIs from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        pois = json.load(f)
+    pois = load_pois(input_file)
     
     # Validate
     checker = POIQualityChecker()
@@ -267,8 +271,7 @@ def main():
     # Save valid POIs if different from input
     if output_file != input_file:
         logger.info(f"\nSaving {len(valid_pois)} valid POIs to {output_file}...")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(valid_pois, f, indent=2, ensure_ascii=False)
+        save_pois(valid_pois, output_file, ndjson=output_file.endswith(('.jsonl', '.ndjson')))
     
     # Exit with appropriate code
     if report['quality_score'] < args.min_score:
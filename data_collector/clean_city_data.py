@@ -10,7 +10,6 @@ load_dotenv()
 
 # City to clean
 CITY = "batumi"
-DESTINATION_ID = "ef571e71-2190-48e8-a67d-80dc898f97d4"
 
 # Connect to Supabase
 url = os.getenv("SUPABASE_URL")
@@ -19,19 +18,15 @@ supabase = create_client(url, key)
 
 print(f"🗑️  Cleaning database for {CITY}...")
 
-# Delete activities
-print("Deleting activities...")
-result = supabase.schema('byd_esp').table('activities').delete().eq('destination_id', DESTINATION_ID).execute()
-print(f"  Deleted {len(result.data) if result.data else 0} activities")
-
-# Delete destination details
-print("Deleting destination details...")
-result = supabase.schema('byd_esp').table('destination_details').delete().eq('destination_id', DESTINATION_ID).execute()
-print(f"  Deleted {len(result.data) if result.data else 0} destination details")
-
-# Delete destination
+# Deleting the destination cascades to its activities and destination details
+# (see migrations/005_destination_fk_cascade.sql)
 print("Deleting destination...")
-result = supabase.schema('byd_esp').table('destinations').delete().eq('slug', CITY).execute()
-print(f"  Deleted {len(result.data) if result.data else 0} destinations")
+result = (
+    supabase.schema('byd_esp').table('destinations')
+    .delete(count='exact', returning='minimal')
+    .eq('slug', CITY)
+    .execute()
+)
+print(f"  Deleted {result.count or 0} destinations (activities and details cascaded)")
 
 print(f"✅ Database cleaned for {CITY}")
@@ -1,7 +1,11 @@
 # City Configurations for Data Collection
 # Format: 'key': {'name': 'City Name', 'country': 'Country Name', 'bbox': {...}}
 
-CITIES = {
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+CITIES = MappingProxyType({
     # --- THAILAND ---
     'bangkok': {
         'name': 'Bangkok',
@@ -164,4 +168,31 @@ CITIES = {
         'country': 'Georgia',
         'bbox': {'north': 42.30, 'south': 42.25, 'east': 42.75, 'west': 42.65}
     },
-}
+})
+
+# Lowercase display name -> CITIES key, e.g. 'chiang mai' -> 'chiang_mai'
+CITY_KEY_BY_NAME = MappingProxyType({config['name'].lower(): key for key, config in CITIES.items()})
+
+@lru_cache(maxsize=None)
+def normalize(city_name: str) -> str:
+    """CITIES key and layer directory name for a city, e.g. 'Tbilisi' -> 'tbilisi'"""
+    name = city_name.lower()
+    return CITY_KEY_BY_NAME.get(name) or name.replace(" ", "_")
+
+# Flat view for code that scans every city: bbox is a (north, south, east, west) tuple
+# or None. CITIES keeps the dict form because callers index bbox['north'] etc.
+City = namedtuple('City', 'key name country bbox')
+
+def _bbox_tuple(bbox):
+    return (bbox['north'], bbox['south'], bbox['east'], bbox['west']) if bbox else None
+
+CITY_RECORDS = tuple(
+    City(key, c['name'], c['country'], _bbox_tuple(c['bbox']))
+    for key, c in CITIES.items()
+)
+
+_by_country = {}
+for _city in CITY_RECORDS:
+    _by_country.setdefault(_city.country, []).append(_city)
+CITIES_BY_COUNTRY = MappingProxyType({country: tuple(cities) for country, cities in _by_country.items()})
+del _by_country, _city
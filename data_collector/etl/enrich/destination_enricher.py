@@ -1,28 +1,49 @@
-import json
+import copy
 import logging
 import requests
 from pathlib import Path
 from typing import Dict, Any, List
-from config.cities_config import CITIES
+from config.cities_config import CITIES, normalize
+from utils import json_utils
+from utils.prompt_cache import PromptCache
 
 logger = logging.getLogger("DestinationEnricher")
 
+# Offline fallback content; only the summary depends on the city.
+# Never returned directly - _get_mock_data hands out deep copies.
+_MOCK_DESTINATION = {
+    "why_go": ["Ancient Architecture", "Delicious Cuisine", "Scenic Views"],
+    "tags": ["heritage", "culture", "food"],
+    "best_months": [4, 5, 9, 10],
+    "monthly_insights": {
+        "1": { "verdict": "Winter chill", "temp": { "avg": 5 }, "crowdLevel": "Low" },
+        "7": { "verdict": "Hot summer", "temp": { "avg": 30 }, "crowdLevel": "High" }
+    },
+    "personality_fit": { "HistoryBuff": 0.9, "Foodie": 0.85 },
+    "budget": { "level": "Mid-Range", "daily_cost": { "backpacker": 40, "luxury": 200 } },
+    "safety": { "score": 0.9, "notes": "Very safe for tourists." },
+    "connectivity": { "wifi": "Excellent", "mobile": "4G/5G available" }
+}
+
 class DestinationEnricher:
     """
     Enriches Destination entities with deep metadata using AI.
     Generates: Monthly Insights, Safety, Budget, Recommendations.
     """
     
-    def __init__(self, gold_dir: Path = Path("layers/gold"), model: str = "gemma3:12b"):
+    def __init__(self, gold_dir: Path = Path("layers/gold"), model: str = "gemma3:12b", cache_path: Path = Path(".cache") / "ollama.sqlite", use_cache: bool = True):
         self.gold_dir = gold_dir
         self.model = model
         self.api_url = "http://localhost:11434/api/generate"
+        self._cache = PromptCache(cache_path, enabled=use_cache)
+        # Reused across cities so the Ollama connection stays open
+        self._session = requests.Session()
         
     def enrich_destination(self, city_name: str) -> bool:
         """
         Generates deep content for a city and saves to Gold Layer.
         """
-        city_key = city_name.lower().replace(" ", "_")
+        city_key = normalize(city_name)
         city_config = CITIES.get(city_key)
         
         if not city_config:
@@ -58,8 +79,7 @@ class DestinationEnricher:
         output_dir.mkdir(parents=True, exist_ok=True)
         
         output_file = output_dir / "destination_details.json"
-        with open(output_file, 'w') as f:
-            json.dump(destination_data, f, indent=2)
+        json_utils.write_json(output_file, destination_data, pretty=True)
             
         logger.info(f"✅ Saved destination details to {output_file}")
         return True
@@ -76,7 +96,7 @@ class DestinationEnricher:
         Calls Ollama to generate the deep JSON object.
         """
         prompt = f"""
-        You are a travel expert. Generate a JSON object for {city}, {country} with this EXACT structure:
+        You are a travel expert. Generate a JSON object for the destination below with this EXACT structure:
         {{
             "summary": "Short catchy description",
             "why_go": ["Reason 1", "Reason 2", "Reason 3"],
@@ -92,21 +112,28 @@ class DestinationEnricher:
             "connectivity": {{ "wifi": "Good", "mobile": "Good" }}
         }}
         Return ONLY valid JSON. No markdown.
+        Destination: {city}, {country}
         """
         
+        cache_key = PromptCache.make_key(self.model, prompt)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                json={"model": self.model, "prompt": prompt, "stream": False, "format": "json"},
+                # keep_alive holds the model in memory between cities of the same run
+                json={"model": self.model, "prompt": prompt, "stream": False, "format": "json", "keep_alive": "30m"},
                 timeout=120
             )
             if response.status_code == 200:
-                res_json = response.json()
+                res_json = json_utils.loads(response.content)
                 content = res_json.get('response', '{}')
                 # Parse JSON from string response
-                if isinstance(content, str):
-                    import json as json_lib
-                    return json_lib.loads(content)
+                if isinstance(content, (str, bytes)):
+                    content = json_utils.loads(content)
+                self._cache.set(cache_key, content)
                 return content
             else:
                 logger.warning(f"Ollama error: {response.status_code}")
@@ -116,17 +143,8 @@ class DestinationEnricher:
             return self._get_mock_data(city)
 
     def _get_mock_data(self, city: str) -> Dict:
+        # Deep copy so callers can't mutate the shared template's nested dicts
         return {
             "summary": f"{city} is a vibrant destination known for its rich history and culture.",
-            "why_go": ["Ancient Architecture", "Delicious Cuisine", "Scenic Views"],
-            "tags": ["heritage", "culture", "food"],
-            "best_months": [4, 5, 9, 10],
-            "monthly_insights": {
-                "1": { "verdict": "Winter chill", "temp": { "avg": 5 }, "crowdLevel": "Low" },
-                "7": { "verdict": "Hot summer", "temp": { "avg": 30 }, "crowdLevel": "High" }
-            },
-            "personality_fit": { "HistoryBuff": 0.9, "Foodie": 0.85 },
-            "budget": { "level": "Mid-Range", "daily_cost": { "backpacker": 40, "luxury": 200 } },
-            "safety": { "score": 0.9, "notes": "Very safe for tourists." },
-            "connectivity": { "wifi": "Excellent", "mobile": "4G/5G available" }
+            **copy.deepcopy(_MOCK_DESTINATION),
         }
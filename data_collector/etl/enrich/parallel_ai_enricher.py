@@ -1,31 +1,88 @@
-import json
 import logging
+import os
 import requests
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from tqdm import tqdm
+from config.cities_config import normalize
+from utils import json_utils
+from utils.prompt_cache import PromptCache
 
 logger = logging.getLogger("ParallelAIEnricher")
 
+# Static instructions come first and stay byte-identical across calls, so
+# Ollama can reuse the evaluated prefix and only process the Name/Type tail
+_PROMPT_PREFIX = """Analyze this tourism POI and provide enrichment data.
+
+Return ONLY valid JSON with:
+1. "description": Engaging 2-sentence description
+2. "duration_min": Recommended visit duration in minutes
+3. "best_time": Best time to visit (Morning/Afternoon/Evening/Anytime)
+4. "personas": Score 0-100 for [Culture, Adventure, Food, Relax]
+
+"""
+
+# Keep the model loaded between calls and cap context/output to what a POI needs
+_OLLAMA_OPTIONS = {"num_ctx": 1024, "num_predict": 256}
+_KEEP_ALIVE = "30m"
+
+# Fallback persona scores when Ollama is unavailable
+_MOCK_PERSONAS = MappingProxyType({"Culture": 80, "Relax": 50})
+
+@dataclass(slots=True)
+class Enrichment:
+    """
+    The LLM-generated fields merged into a POI.
+    POIs themselves stay dicts, since Silver records carry arbitrary OSM keys through to Gold.
+    """
+    description: str
+    duration_min: int = 60
+    best_time: str = "Anytime"
+    personas: Dict = field(default_factory=lambda: {"Culture": 50, "Relax": 50})
+    
+    @classmethod
+    def from_response(cls, data: Dict, poi: Dict) -> "Enrichment":
+        """Build from parsed model output, defaulting any field the model left out."""
+        enrichment = cls(description=data.get('description', poi.get('description', '')))
+        for name in ('duration_min', 'best_time', 'personas'):
+            if name in data:
+                setattr(enrichment, name, data[name])
+        return enrichment
+    
+    def apply(self, poi: Dict) -> Dict:
+        poi['description'] = self.description
+        poi['duration_min'] = self.duration_min
+        poi['best_time'] = self.best_time
+        poi['personas'] = self.personas
+        return poi
+
 class ParallelAIEnricher:
     """
     Parallel version of AIEnricher for faster processing.
     Uses ThreadPoolExecutor to enrich multiple POIs simultaneously.
     """
     
-    def __init__(self, silver_dir: Path, gold_dir: Path, model: str = "gemma3:12b", max_workers: int = 5):
+    def __init__(self, silver_dir: Path, gold_dir: Path, model: str = "gemma3:12b", max_workers: int = 5, cache_path: Path = Path(".cache") / "ollama.sqlite", use_cache: bool = True):
         self.silver_dir = silver_dir
         self.gold_dir = gold_dir
         self.model = model
         self.ollama_url = "http://127.0.0.1:11434/api/generate"
         self.max_workers = max_workers
+        self._cache = PromptCache(cache_path, enabled=use_cache)
+        # One keep-alive connection per worker instead of a new socket per POI
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
         
     def process_city(self, city_name: str, tier: str = "all", limit: int = None) -> bool:
         """
         Enriches POIs for a city using parallel processing.
         """
-        city_key = city_name.lower().replace(" ", "_")
+        city_key = normalize(city_name)
         
         # Load Silver data
         silver_file = self.silver_dir / city_key / "pois.json"
@@ -33,94 +90,123 @@ class ParallelAIEnricher:
             logger.error(f"Silver file not found: {silver_file}")
             return False
             
-        with open(silver_file, 'r') as f:
-            pois = json.load(f)
+        with open(silver_file, 'rb') as f:
+            pois = json_utils.loads(f.read())
             
-        # Load existing Gold data
+        # Gold is pois.json plus an append-only pois.jsonl log of newer POIs;
+        # the log and the osm_id sidecar are shared with AIEnricher
         gold_file = self.gold_dir / city_key / "pois.json"
-        existing_pois = []
-        if gold_file.exists():
-            with open(gold_file, 'r') as f:
-                existing_pois = json.load(f)
-                
-        existing_ids = {poi.get('osm_id') for poi in existing_pois}
+        log_file = gold_file.with_name("pois.jsonl")
+        ids_file = gold_file.with_name("enriched_ids.txt")
+        gold_file.parent.mkdir(parents=True, exist_ok=True)
+        if ids_file.exists():
+            existing_ids = set(ids_file.read_text(encoding='utf-8').splitlines())
+        else:
+            existing_ids = {str(poi.get('osm_id')) for poi in self._load_gold(gold_file, log_file)}
+            ids_file.write_text(''.join(f"{osm_id}\n" for osm_id in existing_ids), encoding='utf-8')
         
-        # Filter POIs to enrich
-        to_enrich = [poi for poi in pois if poi.get('osm_id') not in existing_ids]
+        # One C-level set difference settles the common "everything already enriched" case
+        # before any pool, log file or per-POI filtering is set up
+        pending_ids = {str(poi.get('osm_id')) for poi in pois}
+        pending_ids -= existing_ids
+        if not pending_ids:
+            logger.info(f"✅ Enriched 0 POIs. Total: {len(existing_ids)}")
+            return True
         
-        if tier != "all":
-            to_enrich = [poi for poi in to_enrich if poi.get('priority_tier') == tier]
-            
-        if limit:
-            to_enrich = to_enrich[:limit]
+        # Filter POIs to enrich in a single pass, stopping once the limit is reached
+        to_enrich = (
+            poi for poi in pois
+            if str(poi.get('osm_id')) in pending_ids
+            and (tier == "all" or poi.get('priority_tier') == tier)
+        )
+        to_enrich = list(islice(to_enrich, limit or None))
             
         logger.info(f"Enriching {len(to_enrich)} POIs for {city_name} using {self.max_workers} workers...")
         
-        # Parallel enrichment
-        enriched_pois = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        # Parallel enrichment; each result is appended as it lands, so a run costs O(new POIs)
+        enriched_count = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                open(log_file, 'ab') as log, \
+                open(ids_file, 'a', encoding='utf-8') as ids_log:
             future_to_poi = {executor.submit(self._enrich_poi, poi): poi for poi in to_enrich}
             
             for future in tqdm(as_completed(future_to_poi), total=len(to_enrich), desc=f"Enriching {city_name}"):
                 try:
                     enriched_poi = future.result()
                     if enriched_poi:
-                        enriched_pois.append(enriched_poi)
+                        log.write(json_utils.dumpb(enriched_poi) + b"\n")
+                        ids_log.write(f"{enriched_poi.get('osm_id')}\n")
+                        existing_ids.add(str(enriched_poi.get('osm_id')))
+                        enriched_count += 1
                 except Exception as e:
                     poi = future_to_poi[future]
                     logger.error(f"Failed to enrich {poi.get('name')}: {e}")
-                    
-        # Merge with existing
-        all_pois = existing_pois + enriched_pois
-        
-        # Save to Gold
-        gold_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(gold_file, 'w') as f:
-            json.dump(all_pois, f, indent=2, ensure_ascii=False)
             
-        logger.info(f"✅ Enriched {len(enriched_pois)} POIs. Total: {len(all_pois)}")
+        logger.info(f"✅ Enriched {enriched_count} POIs. Total: {len(existing_ids)}")
         return True
         
-    def _enrich_poi(self, poi: Dict) -> Dict:
+    def finalize(self, city_name: str) -> bool:
         """
-        Enriches a single POI using Ollama.
+        Folds the pois.jsonl log into a single Gold pois.json for consumers that need one file.
         """
-        prompt = f"""
-        Analyze this tourism POI and provide enrichment data:
-        Name: {poi.get('name')}
-        Type: {poi.get('poi_type')}
+        city_key = normalize(city_name)
+        gold_file = self.gold_dir / city_key / "pois.json"
+        log_file = gold_file.with_name("pois.jsonl")
+        if not log_file.exists():
+            return False
         
-        Return ONLY valid JSON with:
-        1. "description": Engaging 2-sentence description
-        2. "duration_min": Recommended visit duration in minutes
-        3. "best_time": Best time to visit (Morning/Afternoon/Evening/Anytime)
-        4. "personas": Score 0-100 for [Culture, Adventure, Food, Relax]
+        # Write to a temp file and swap it in, so a crash never leaves a truncated pois.json
+        tmp_file = gold_file.with_suffix('.json.tmp')
+        json_utils.write_json(tmp_file, self._load_gold(gold_file, log_file))
+        os.replace(tmp_file, gold_file)
+        log_file.unlink()
+        return True
         
-        Return ONLY valid JSON.
+    def _load_gold(self, gold_file: Path, log_file: Path) -> List[Dict]:
+        """Existing Gold POIs plus any appended to the log, later entries winning."""
+        gold_by_id = {}
+        if gold_file.exists():
+            with open(gold_file, 'rb') as f:
+                gold_by_id = {p.get('osm_id'): p for p in json_utils.loads(f.read())}
+        if log_file.exists():
+            for p in json_utils.read_jsonl(log_file):
+                gold_by_id[p.get('osm_id')] = p
+        return list(gold_by_id.values())
+        
+    def _enrich_poi(self, poi: Dict) -> Dict:
         """
+        Enriches a single POI using Ollama.
+        """
+        prompt = f"{_PROMPT_PREFIX}Name: {poi.get('name')}\nType: {poi.get('poi_type')}\n"
+        
+        cache_key = PromptCache.make_key(self.model, prompt)
+        enrichment = self._cache.get(cache_key)
+        if enrichment is not None:
+            return Enrichment.from_response(enrichment, poi).apply(poi)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.ollama_url,
-                json={"model": self.model, "prompt": prompt, "stream": False, "format": "json"},
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json",
+                    "options": _OLLAMA_OPTIONS,
+                    "keep_alive": _KEEP_ALIVE,
+                },
                 timeout=120
             )
             if response.status_code == 200:
-                res_json = response.json()
+                res_json = json_utils.loads(response.content)
                 content = res_json['response']
                 # Extract JSON from response
                 start = content.find('{')
                 end = content.rfind('}') + 1
                 if start != -1 and end > start:
-                    enrichment = json.loads(content[start:end])
-                    
-                    # Merge enrichment with original POI
-                    poi['description'] = enrichment.get('description', poi.get('description', ''))
-                    poi['duration_min'] = enrichment.get('duration_min', 60)
-                    poi['best_time'] = enrichment.get('best_time', 'Anytime')
-                    poi['personas'] = enrichment.get('personas', {"Culture": 50, "Relax": 50})
-                    
-                    return poi
+                    enrichment = json_utils.loads(content[start:end])
+                    self._cache.set(cache_key, enrichment)
+                    return Enrichment.from_response(enrichment, poi).apply(poi)
             else:
                 logger.warning(f"Ollama returned status {response.status_code}")
                 return self._mock_enrich(poi)
@@ -133,5 +219,5 @@ class ParallelAIEnricher:
         poi['description'] = poi.get('description', f"A wonderful place in {poi.get('city_name', 'the city')}.")
         poi['duration_min'] = 60
         poi['best_time'] = "Morning"
-        poi['personas'] = {"Culture": 80, "Relax": 50}
+        poi['personas'] = dict(_MOCK_PERSONAS)
         return poi
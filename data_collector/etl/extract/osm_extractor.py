@@ -1,36 +1,67 @@
-import json
 import logging
+import random
 import time
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import sys
+from requests.adapters import HTTPAdapter
 
 # Add parent dir to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config.cities_config import CITIES
+from config.cities_config import CITIES, normalize
+from utils import json_utils
 
 logger = logging.getLogger("OSMExtractor")
 
+# Identical text for identical tiles lets Overpass serve repeat runs from its cache
+_OVERPASS_QUERY = """
+[out:json][timeout:25];
+(
+  node["tourism"]({south},{west},{north},{east});
+  way["tourism"]({south},{west},{north},{east});
+  relation["tourism"]({south},{west},{north},{east});
+
+  node["amenity"~"restaurant|cafe|bar|pub"]({south},{west},{north},{east});
+  way["amenity"~"restaurant|cafe|bar|pub"]({south},{west},{north},{east});
+
+  node["historic"]({south},{west},{north},{east});
+  way["historic"]({south},{west},{north},{east});
+);
+out body;
+>;
+out skel qt;
+"""
+
 class OSMExtractor:
     """
     Extracts raw data from OpenStreetMap and saves to Bronze Layer.
     """
     
-    def __init__(self, bronze_dir: Path):
+    def __init__(self, bronze_dir: Path, max_workers: int = 2, max_retries: int = 5):
         self.bronze_dir = bronze_dir
         self.overpass_url = "http://overpass-api.de/api/interpreter"
         self.headers = {
-            'User-Agent': 'TravelDataCollector/1.0 (contact@example.com)'
+            'User-Agent': 'TravelDataCollector/1.0 (contact@example.com)',
+            # Overpass JSON is highly repetitive; compressed responses are several times smaller
+            'Accept-Encoding': 'gzip, deflate'
         }
+        # Overpass grants ~2 concurrent query slots per client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self._session.headers.update(self.headers)
 
     def extract_city(self, city_name: str) -> bool:
         """
         Harvests data for a city and saves to Bronze layer.
+        Returns False if no tile could be fetched.
         """
-        city_key = city_name.lower().replace(" ", "_")
+        city_key = normalize(city_name)
         city_config = CITIES.get(city_key)
         
         if not city_config:
@@ -39,8 +70,8 @@ class OSMExtractor:
             
         bbox = city_config['bbox']
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Created by the first saved tile, so a failed harvest never becomes the "latest" one
         output_dir = self.bronze_dir / city_key / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
         
         logger.info(f"Starting harvest for {city_name}...")
         
@@ -49,20 +80,18 @@ class OSMExtractor:
         tiles = self._generate_tiles(bbox)
         
         total_elements = 0
-        for i, tile in enumerate(tiles):
-            data = self._fetch_tile(tile)
-            if data:
-                elements = data.get('elements', [])
-                count = len(elements)
-                total_elements += count
-                
-                # Save raw tile
-                tile_file = output_dir / f"tile_{i}.json"
-                with open(tile_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False)
-                
-                logger.info(f"Saved tile {i} with {count} elements")
-                time.sleep(1) # Respect rate limits
+        saved_tiles = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_and_save, i, tile, output_dir) for i, tile in enumerate(tiles)]
+            for future in as_completed(futures):
+                count = future.result()
+                if count is not None:
+                    saved_tiles += 1
+                    total_elements += count
+        
+        if not saved_tiles:
+            logger.error(f"❌ Harvest failed for {city_name}: no tile could be fetched")
+            return False
                 
         # Save metadata
         metadata = {
@@ -72,8 +101,7 @@ class OSMExtractor:
             "source": "OpenStreetMap",
             "bbox": bbox
         }
-        with open(output_dir / "metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        json_utils.write_json(output_dir / "metadata.json", metadata, pretty=True)
             
         logger.info(f"✅ Harvest complete for {city_name}. Total elements: {total_elements}")
         return True
@@ -94,36 +122,49 @@ class OSMExtractor:
                 tiles.append({'north': north, 'south': south, 'east': east, 'west': west})
         return tiles
 
+    def _fetch_and_save(self, i: int, tile: Dict, output_dir: Path) -> Optional[int]:
+        """
+        Fetches one tile and writes it to Bronze from the same worker,
+        so compressing and writing a tile overlaps with the other worker's fetch.
+        Returns the number of elements saved, or None if the tile could not be fetched.
+        """
+        data = self._fetch_tile(tile)
+        if not data:
+            return None
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Save the tile's raw elements one per line, so Silver can stream them back;
+        # Overpass JSON repeats tag keys heavily, so it compresses well
+        tile_file = output_dir / f"tile_{i}.jsonl.gz"
+        count = json_utils.write_jsonl(tile_file, data.get('elements', ()))
+        
+        logger.info(f"Saved tile {i} with {count} elements")
+        return count
+
     def _fetch_tile(self, bbox: Dict) -> Optional[Dict]:
         """Fetches data for a single tile."""
-        query = f"""
-        [out:json][timeout:25];
-        (
-          node["tourism"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          way["tourism"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          relation["tourism"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          
-          node["amenity"~"restaurant|cafe|bar|pub"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          way["amenity"~"restaurant|cafe|bar|pub"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          
-          node["historic"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-          way["historic"]({bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']});
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-        try:
-            response = requests.post(self.overpass_url, data=query, headers=self.headers)
+        query = _OVERPASS_QUERY.format_map(bbox)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.post(self.overpass_url, data=query)
+            except Exception as e:
+                logger.error(f"Exception fetching tile: {e}")
+                return None
             if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 429:
-                logger.warning("Rate limited. Sleeping...")
-                time.sleep(5)
-                return self._fetch_tile(bbox) # Retry
+                return json_utils.loads(response.content)
+            elif response.status_code == 429 and attempt < self.max_retries:
+                # Jitter keeps the parallel workers from retrying in lockstep
+                delay = self._retry_after(response) + random.uniform(0, 1)
+                logger.warning(f"Rate limited. Sleeping {delay:.1f}s...")
+                time.sleep(delay)
             else:
                 logger.error(f"Error fetching tile: {response.status_code}")
                 return None
-        except Exception as e:
-            logger.error(f"Exception fetching tile: {e}")
-            return None
+
+    def _retry_after(self, response, default: float = 5.0) -> float:
+        """Seconds to wait according to a 429's Retry-After header."""
+        try:
+            return float(response.headers.get('Retry-After', default))
+        except ValueError:
+            # HTTP-date form; not worth parsing for Overpass
+            return default
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 from pathlib import Path
@@ -7,11 +6,44 @@ import sys
 
 # Add parent dir to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from utils.database import Database
-from config.cities_config import CITIES
+from utils.database import get_database
+from config.cities_config import CITIES, normalize
+from utils import json_utils
 
 logger = logging.getLogger("SupabaseLoader")
 
+def _poi_to_activity(poi: Dict, destination_id) -> Dict:
+    """Maps a Gold POI onto a byd_esp.activities row."""
+    # Extract contact info
+    contact_info = poi.get('contact') or {}
+    
+    return {
+        "destination_id": destination_id,
+        "osm_id": poi.get('osm_id'),
+        "name": poi['name'],
+        "category": poi.get('category', 'unknown'),
+        "coordinates": poi['coordinates'],
+        "description": poi.get('description'),
+        "tags": list(poi.get('tags', {})),
+        "personas": poi.get('personas', {}),
+        "is_popular": poi.get('is_popular', False),
+        "duration_min": poi.get('duration_min', 60),
+        "price_level": poi.get('price_level', 2),
+        # New fields from Phase 1 & 2
+        "opening_hours": poi.get('opening_hours'),
+        "address": poi.get('address'),
+        "phone": contact_info.get('phone'),
+        "email": contact_info.get('email'),
+        "website": contact_info.get('website'),
+        "best_time": poi.get('best_time'),
+        "best_time_reason": poi.get('best_time_reason'),
+        "tips": poi.get('tips', []),
+        "what_to_expect": poi.get('what_to_expect'),
+        "wikidata": poi.get('wikidata'),
+        "wikimedia_commons": poi.get('wikimedia_commons'),
+        "wikipedia": poi.get('wikipedia')
+    }
+
 class SupabaseLoader:
     """
     Loads Gold data into Supabase (Production Database).
@@ -20,28 +52,28 @@ class SupabaseLoader:
     def __init__(self, gold_dir: Path):
         self.gold_dir = gold_dir
         # Initialize with new schema 'byd_esp'
-        self.db = Database(schema='byd_esp')
+        self.db = get_database('byd_esp')
         self.client = self.db.client
-        self.db = Database(schema='byd_esp')
         
-    def load_gold_layer(self, city_name: str):
+    def load_gold_layer(self, city_name: str) -> bool:
         """
         Loads enriched data (Destinations & Activities) into 'byd_esp' schema.
+        Returns False if the city's Gold data or its destination row could not be loaded.
         """
-        city_key = city_name.lower().replace(" ", "_")
+        city_key = normalize(city_name)
         city_gold_dir = self.gold_dir / city_key
         
         if not city_gold_dir.exists():
             logger.warning(f"Gold layer not found for {city_name} at {city_gold_dir}")
-            return
+            return False
 
         # 1. Load Destination Details
         dest_file = city_gold_dir / "destination_details.json"
         destination_id = None
         
         if dest_file.exists():
-            with open(dest_file, 'r') as f:
-                dest_data = json.load(f)
+            with open(dest_file, 'rb') as f:
+                dest_data = json_utils.loads(f.read())
                 
             # Upsert Destination Core
             core_data = {
@@ -54,14 +86,11 @@ class SupabaseLoader:
             }
             
             try:
-                # Upsert into byd_esp.destinations
-                self.db.client.table('destinations').upsert(core_data, on_conflict='slug').execute()
-                
-                # Fetch ID separately to be safe
-                res = self.db.client.table('destinations').select('id').eq('slug', core_data['slug']).single().execute()
+                # Upsert into byd_esp.destinations; the returned row carries the ID
+                res = self.db.client.table('destinations').upsert(core_data, on_conflict='slug').execute()
                 
                 if res.data:
-                    destination_id = res.data['id']
+                    destination_id = res.data[0]['id']
                     logger.info(f"✅ Loaded Destination: {dest_data['name']} (ID: {destination_id})")
                     
                     # Upsert Destination Details
@@ -81,57 +110,39 @@ class SupabaseLoader:
                     logger.info("✅ Loaded Destination Details")
             except Exception as e:
                 logger.error(f"Failed to load destination: {e}")
-                return
+                return False
 
         if not destination_id:
             logger.error("Cannot load activities without destination ID")
-            return
+            return False
 
         # 2. Load Activities
         pois_file = city_gold_dir / "pois.json"
-        if pois_file.exists():
+        # POIs appended by the enrichers since pois.json was last rewritten
+        log_file = city_gold_dir / "pois.jsonl"
+        if pois_file.exists() or log_file.exists():
             try:
-                with open(pois_file, 'r') as f:
-                    pois = json.load(f)
+                pois = []
+                if pois_file.exists():
+                    with open(pois_file, 'rb') as f:
+                        pois = json_utils.loads(f.read())
+                if log_file.exists():
+                    pois_by_id = {poi.get('osm_id'): poi for poi in pois}
+                    pois_by_id.update((poi.get('osm_id'), poi) for poi in json_utils.read_jsonl(log_file))
+                    pois = list(pois_by_id.values())
                 
-                activities = []
-                for poi in pois:
-                    # Extract contact info
-                    contact_info = poi.get('contact', {})
-                    
-                    activity = {
-                        "destination_id": destination_id,
-                        "name": poi['name'],
-                        "category": poi.get('category', 'unknown'),
-                        "coordinates": poi['coordinates'],
-                        "description": poi.get('description'),
-                        "tags": [k for k,v in poi.get('tags', {}).items()],
-                        "personas": poi.get('personas', {}),
-                        "is_popular": poi.get('is_popular', False),
-                        "duration_min": poi.get('duration_min', 60),
-                        "price_level": poi.get('price_level', 2),
-                        # New fields from Phase 1 & 2
-                        "opening_hours": poi.get('opening_hours'),
-                        "address": poi.get('address'),
-                        "phone": contact_info.get('phone') if contact_info else None,
-                        "email": contact_info.get('email') if contact_info else None,
-                        "website": contact_info.get('website') if contact_info else None,
-                        "best_time": poi.get('best_time'),
-                        "best_time_reason": poi.get('best_time_reason'),
-                        "tips": poi.get('tips', []),
-                        "what_to_expect": poi.get('what_to_expect'),
-                        "wikidata": poi.get('wikidata'),
-                        "wikimedia_commons": poi.get('wikimedia_commons'),
-                        "wikipedia": poi.get('wikipedia')
-                    }
-                    activities.append(activity)
+                # Keyed by osm_id: one upsert cannot touch the same row twice
+                activities = list({poi.get('osm_id'): _poi_to_activity(poi, destination_id) for poi in pois}.values())
                 
-                # Batch Insert
-                batch_size = 50
+                # Batch Upsert, re-runs update rows in place
+                # (see migrations/006_byd_esp_activities_dest_osm_id_unique.sql)
+                batch_size = 1000
                 for i in range(0, len(activities), batch_size):
                     batch = activities[i:i+batch_size]
                     try:
-                        self.db.client.table('activities').insert(batch).execute()
+                        self.db.client.table('activities').upsert(
+                            batch, on_conflict='destination_id,osm_id', returning='minimal'
+                        ).execute()
                         logger.info(f"Loaded batch {i//batch_size + 1} ({len(batch)} activities)")
                     except Exception as e:
                         logger.error(f"Error loading batch {i}: {e}")
@@ -139,4 +150,6 @@ class SupabaseLoader:
                 logger.info(f"✅ Successfully loaded {len(activities)} activities for {city_name}")
             except Exception as e:
                 logger.error(f"Error managing activities for {city_name}: {e}")
-                return
+                return False
+        
+        return True
@@ -1,11 +1,20 @@
 import pandas as pd
-import json
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import BinaryIO, List, Dict, Union
+from config.cities_config import normalize
+from utils import json_utils
 
 logger = logging.getLogger("CSVStandardizer")
 
+# Accepted header spellings for each Silver field, in priority order
+_NAME_COLUMNS = ['name', 'title', 'place_name']
+_LAT_COLUMNS = ['lat', 'latitude', 'y']
+_LON_COLUMNS = ['lon', 'lng', 'longitude', 'x']
+_CATEGORY_COLUMNS = ['category', 'type']
+_DESCRIPTION_COLUMNS = ['description', 'desc']
+_CSV_COLUMNS = frozenset(_NAME_COLUMNS + _LAT_COLUMNS + _LON_COLUMNS + _CATEGORY_COLUMNS + _DESCRIPTION_COLUMNS)
+
 class CSVStandardizer:
     """
     Standardizes CSV uploads into the Silver Layer schema.
@@ -14,44 +23,48 @@ class CSVStandardizer:
     def __init__(self, silver_dir: Path):
         self.silver_dir = silver_dir
         
-    def process_csv(self, file_path: Path, city_name: str) -> bool:
+    def process_csv(self, file_path: Union[Path, BinaryIO], city_name: str) -> bool:
         """
-        Reads a CSV file, maps columns, and saves to Silver Layer.
+        Reads a CSV file (a path or an open binary buffer), maps columns, and saves to Silver Layer.
         """
         try:
-            df = pd.read_csv(file_path)
+            # Only parse the columns we map; wide uploads skip the rest entirely
+            df = pd.read_csv(file_path, usecols=lambda c: c.lower().strip() in _CSV_COLUMNS)
             logger.info(f"Loaded CSV with {len(df)} rows")
             
             # Normalize columns
             df.columns = [c.lower().strip() for c in df.columns]
             
-            pois = []
-            for _, row in df.iterrows():
-                # Flexible column mapping
-                name = row.get('name') or row.get('title') or row.get('place_name')
-                if not name:
-                    continue
-                    
-                lat = row.get('lat') or row.get('latitude') or row.get('y')
-                lon = row.get('lon') or row.get('lng') or row.get('longitude') or row.get('x')
-                
-                if pd.isna(lat) or pd.isna(lon):
-                    continue
-                    
-                category = row.get('category') or row.get('type') or 'unknown'
-                description = row.get('description') or row.get('desc') or None
-                
-                poi = {
-                    "name": name,
-                    "category": category,
-                    "coordinates": {"lat": float(lat), "lng": float(lon)},
-                    "description": description,
+            # Flexible column mapping, resolved per column instead of per row
+            name = self._coalesce(df, _NAME_COLUMNS)
+            lat = pd.to_numeric(self._coalesce(df, _LAT_COLUMNS), errors='coerce')
+            lon = pd.to_numeric(self._coalesce(df, _LON_COLUMNS), errors='coerce')
+            category = self._coalesce(df, _CATEGORY_COLUMNS).fillna('unknown')
+            description = self._coalesce(df, _DESCRIPTION_COLUMNS)
+            
+            mask = name.notna() & lat.notna() & lon.notna()
+            today = pd.Timestamp.now().strftime('%Y%m%d')
+            
+            pois = [
+                {
+                    "name": n,
+                    "category": c,
+                    "coordinates": {"lat": la, "lng": lo},
+                    "description": d if pd.notna(d) else None,
                     "tags": {"source": "csv_upload"},
-                    "osm_id": f"csv_{pd.Timestamp.now().strftime('%Y%m%d')}_{_}",
+                    "osm_id": f"csv_{today}_{i}",
                     "priority_score": 100, # Assume uploaded data is important
                     "is_manual": True
                 }
-                pois.append(poi)
+                for i, n, c, la, lo, d in zip(
+                    df.index[mask].tolist(),
+                    name[mask].tolist(),
+                    category[mask].tolist(),
+                    lat[mask].tolist(),
+                    lon[mask].tolist(),
+                    description[mask].tolist(),
+                )
+            ]
                 
             if not pois:
                 logger.warning("No valid POIs found in CSV")
@@ -59,7 +72,7 @@ class CSVStandardizer:
                 
             # Save to Silver Layer (merge with manual_pois.json or create new csv_pois.json)
             # We'll use a separate file 'csv_pois.json' and update AIEnricher to read it too
-            city_key = city_name.lower().replace(" ", "_")
+            city_key = normalize(city_name)
             output_dir = self.silver_dir / city_key
             output_dir.mkdir(parents=True, exist_ok=True)
             
@@ -67,12 +80,11 @@ class CSVStandardizer:
             
             # Merge with existing CSV POIs if any
             if output_file.exists():
-                with open(output_file, 'r') as f:
-                    existing = json.load(f)
+                with open(output_file, 'rb') as f:
+                    existing = json_utils.loads(f.read())
                 pois.extend(existing)
                 
-            with open(output_file, 'w') as f:
-                json.dump(pois, f, indent=2)
+            json_utils.write_json(output_file, pois)
                 
             logger.info(f"✅ Saved {len(pois)} POIs from CSV to {output_file}")
             return True
@@ -80,3 +92,8 @@ class CSVStandardizer:
         except Exception as e:
             logger.error(f"Failed to process CSV: {e}")
             return False
+
+    @staticmethod
+    def _coalesce(df: pd.DataFrame, candidates: List[str]) -> pd.Series:
+        """First non-null value across the candidate columns, row by row"""
+        return df.reindex(columns=candidates).bfill(axis=1).iloc[:, 0]
@@ -3,33 +3,115 @@ Data Quality Validator for Tourism POI Pipeline
 Ensures only high-quality, English-language data reaches Gold layer
 """
 
+import os
 import re
+import string
 import logging
+import multiprocessing
+from collections import Counter
+from multiprocessing.pool import Pool
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
 logger = logging.getLogger("DataQualityValidator")
 
+# Characters allowed in an English name: the same set as the regex
+# ^[A-Za-z0-9\s\-\'\.\,\&\(\)]+$, where \s is Unicode whitespace (all below U+3001)
+ENGLISH_CHARS = frozenset(string.ascii_letters + string.digits + "-'.,&()").union(
+    c for c in map(chr, range(0x3001)) if c.isspace()
+)
+
+# Common non-English scripts to detect, as inclusive codepoint ranges in reporting priority
+_SCRIPT_RANGES = (
+    ('georgian', 0x10A0, 0x10FF),  # Georgian
+    ('cyrillic', 0x0400, 0x04FF),  # Russian/Cyrillic
+    ('arabic', 0x0600, 0x06FF),    # Arabic
+    ('chinese', 0x4E00, 0x9FFF),   # Chinese
+    ('japanese', 0x3040, 0x30FF),  # Japanese (Hiragana + Katakana)
+    ('korean', 0xAC00, 0xD7AF),    # Korean
+)
+
+# Script rank + 1 for every BMP codepoint, 0 for none; all ranges above lie in the BMP,
+# so classifying a character is a single index instead of a range search
+_SCRIPT_ID = bytearray(0x10000)
+for _rank, (_name, _lo, _hi) in enumerate(_SCRIPT_RANGES, 1):
+    _SCRIPT_ID[_lo:_hi + 1] = bytes([_rank]) * (_hi - _lo + 1)
+del _rank, _name, _lo, _hi
+
+def _script_class(ranges) -> "re.Pattern":
+    return re.compile('[' + ''.join(f'\\u{lo:04X}-\\u{hi:04X}' for _, lo, hi in ranges) + ']')
+
+# _SCRIPTS_BEFORE[r] matches a character of any script ranked before r
+_SCRIPTS_BEFORE = (None,) + tuple(_script_class(_SCRIPT_RANGES[:r]) for r in range(1, len(_SCRIPT_RANGES) + 1))
+
+def detect_script(text: str) -> str:
+    """Name of the highest-priority non-English script present in text, or 'unknown'"""
+    # Every script is outside ASCII
+    if text.isascii():
+        return "unknown"
+    # Scanning stays in the regex engine: find the first character of any script, look its
+    # rank up in the table, then only search on for scripts that outrank it (Georgian stops at once)
+    best = len(_SCRIPT_RANGES)
+    pos = 0
+    while best:
+        match = _SCRIPTS_BEFORE[best].search(text, pos)
+        if match is None:
+            break
+        best = _SCRIPT_ID[ord(match.group())] - 1
+        pos = match.end()
+    return _SCRIPT_RANGES[best][0] if best < len(_SCRIPT_RANGES) else "unknown"
+
+# The ASCII subset as bytes, for bytes.translate's delete argument
+_ENGLISH_ASCII = bytes(c for c in range(128) if chr(c) in ENGLISH_CHARS)
+
+def is_english(text: str) -> bool:
+    """True if text is non-empty and uses only English letters, digits, whitespace and basic punctuation"""
+    if text.isascii():
+        # Common case: delete every allowed byte in C; anything left over is disallowed
+        return bool(text) and not text.encode().translate(None, _ENGLISH_ASCII)
+    # Non-ASCII whitespace (e.g. U+00A0) is still allowed, so fall back to the full set
+    return ENGLISH_CHARS.issuperset(text)
+
+# Below this many POIs per process, pickling them out to a pool costs more than it saves
+_POIS_PER_PROCESS = 10_000
+
+def process_count(n_pois: int) -> int:
+    """Worker processes worth starting for a batch of n_pois (1 means stay in-process)"""
+    return min(os.cpu_count() or 1, max(1, n_pois // _POIS_PER_PROCESS))
+
+def split_batch(pois: List, parts: int) -> List[List]:
+    """Split pois into at most `parts` contiguous chunks, preserving order"""
+    size = -(-len(pois) // parts)
+    return [pois[i:i + size] for i in range(0, len(pois), size)]
+
+# Pools are opened from pipeline threads while other threads (HTTP clients, the db log flusher)
+# hold locks, so workers come from a fork server (or spawn) instead of a fork of this process
+_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+def process_pool(processes: int) -> Pool:
+    """Worker pool for process_count() processes, started without forking the caller"""
+    return _POOL_CONTEXT.Pool(processes)
+
 class DataQualityValidator:
     """
     Validates POI data quality before enrichment.
     Filters out non-English names, invalid data, and low-quality entries.
     """
     
+    # Suspicious name patterns fused into one case-insensitive alternation, so each
+    # name is scanned once. The old all-uppercase check (^[A-Z\s]+$) is not included:
+    # it ran against the lowercased name and so never matched.
+    _SUSPICIOUS_RE = re.compile('|'.join(f'(?:{p})' for p in (
+        r'^\d+$',  # Only numbers
+        r'test',  # Test data
+        r'unknown',  # Unknown/placeholder
+        r'unnamed',  # Unnamed locations
+        r'^[a-z]{1,2}$',  # Single/double letter codes
+    )), re.IGNORECASE)
+    
     def __init__(self):
-        # English alphabet + common punctuation
-        self.english_pattern = re.compile(r'^[A-Za-z0-9\s\-\'\.\,\&\(\)]+$')
-        
-        # Common non-English scripts to detect
-        self.non_english_scripts = {
-            'georgian': re.compile(r'[\u10A0-\u10FF]'),  # Georgian
-            'cyrillic': re.compile(r'[\u0400-\u04FF]'),  # Russian/Cyrillic
-            'arabic': re.compile(r'[\u0600-\u06FF]'),    # Arabic
-            'chinese': re.compile(r'[\u4E00-\u9FFF]'),   # Chinese
-            'japanese': re.compile(r'[\u3040-\u309F\u30A0-\u30FF]'),  # Japanese
-            'korean': re.compile(r'[\uAC00-\uD7AF]'),    # Korean
-        }
-        
         # Minimum quality thresholds
         self.min_name_length = 2
         self.max_name_length = 100
@@ -84,57 +166,36 @@ class DataQualityValidator:
     def _is_english(self, text: str) -> bool:
         """Check if text is primarily English characters"""
         # Allow some special characters but text should be mostly English
-        return bool(self.english_pattern.match(text))
+        return is_english(text)
     
     def _detect_script(self, text: str) -> str:
         """Detect which non-English script is present"""
-        for script_name, pattern in self.non_english_scripts.items():
-            if pattern.search(text):
-                return script_name
-        return "unknown"
+        return detect_script(text)
     
     def _has_valid_coordinates(self, poi: Dict) -> bool:
         """Validate coordinate values"""
         try:
             lat = float(poi.get('lat', 0))
             lon = float(poi.get('lon', 0))
-            
-            # Check if coordinates are in valid range
-            if not (-90 <= lat <= 90):
-                return False
-            if not (-180 <= lon <= 180):
-                return False
-            
-            # Check if coordinates are not (0, 0) - likely invalid
-            if lat == 0 and lon == 0:
-                return False
-            
-            return True
         except (ValueError, TypeError):
             return False
+        
+        # In valid range, and not (0, 0) - likely invalid
+        return -90 <= lat <= 90 and -180 <= lon <= 180 and (lat != 0 or lon != 0)
     
     def _has_required_fields(self, poi: Dict) -> bool:
         """Check if POI has all required fields"""
-        required_fields = ['name', 'lat', 'lon', 'poi_type']
-        return all(field in poi and poi[field] for field in required_fields)
+        # A coordinate of 0 (equator / prime meridian) is a real value, so only absence counts
+        return bool(
+            poi.get('name')
+            and poi.get('lat') is not None
+            and poi.get('lon') is not None
+            and poi.get('poi_type')
+        )
     
     def _is_suspicious(self, name: str) -> bool:
         """Detect suspicious patterns in names"""
-        suspicious_patterns = [
-            r'^\d+$',  # Only numbers
-            r'^[A-Z\s]+$',  # Only uppercase (likely abbreviation or code)
-            r'test',  # Test data
-            r'unknown',  # Unknown/placeholder
-            r'unnamed',  # Unnamed locations
-            r'^[a-z]{1,2}$',  # Single/double letter codes
-        ]
-        
-        name_lower = name.lower()
-        for pattern in suspicious_patterns:
-            if re.search(pattern, name_lower):
-                return True
-        
-        return False
+        return self._SUSPICIOUS_RE.search(name) is not None
     
     def validate_batch(self, pois: List[Dict]) -> Tuple[List[Dict], Dict]:
         """
@@ -143,30 +204,56 @@ class DataQualityValidator:
         Returns:
             (valid_pois, stats) - List of valid POIs and validation statistics
         """
-        valid_pois = []
+        processes = process_count(len(pois))
+        if processes > 1:
+            # Chunks are validated in worker processes and merged back in input order;
+            # workers only report positions, so the caller's own POI objects are returned
+            valid_pois = []
+            reason_counts = Counter()
+            chunks = split_batch(pois, processes)
+            with process_pool(processes) as pool:
+                for chunk, (indices, chunk_reasons) in zip(chunks, pool.imap(self._valid_indices, chunks)):
+                    valid_pois.extend(chunk[i] for i in indices)
+                    reason_counts.update(chunk_reasons)
+        else:
+            valid_pois, reason_counts = self._validate_chunk(pois)
+        
         stats = {
             'total': len(pois),
-            'valid': 0,
-            'rejected': 0,
-            'rejection_reasons': {}
+            'valid': len(valid_pois),
+            'rejected': len(pois) - len(valid_pois),
+            'rejection_reasons': dict(reason_counts)
         }
+        return valid_pois, stats
+    
+    def _valid_indices(self, pois: List[Dict]) -> Tuple[List[int], Counter]:
+        """_validate_chunk for a pool worker: positions of the valid POIs within pois"""
+        valid_pois, reason_counts = self._validate_chunk(pois)
+        position = {id(poi): i for i, poi in enumerate(pois)}
+        return [position[id(poi)] for poi in valid_pois], reason_counts
+    
+    def _validate_chunk(self, pois: List[Dict]) -> Tuple[List[Dict], Counter]:
+        """Validate POIs in-process, returning the valid ones and a count of rejection reasons"""
+        valid_pois = []
+        reason_counts = Counter()
+        # Hoisted out of the loop; the per-POI debug message is only formatted when it will be emitted
+        validate = self.validate_poi
+        log_rejections = logger.isEnabledFor(logging.DEBUG)
         
         for poi in pois:
-            is_valid, reasons = self.validate_poi(poi)
+            is_valid, reasons = validate(poi)
             
             if is_valid:
                 valid_pois.append(poi)
-                stats['valid'] += 1
             else:
-                stats['rejected'] += 1
                 # Track rejection reasons
-                for reason in reasons:
-                    stats['rejection_reasons'][reason] = stats['rejection_reasons'].get(reason, 0) + 1
+                reason_counts.update(reasons)
                 
                 # Log rejected POI
-                logger.debug(f"Rejected POI: {poi.get('name', 'N/A')} - Reasons: {', '.join(reasons)}")
+                if log_rejections:
+                    logger.debug(f"Rejected POI: {poi.get('name', 'N/A')} - Reasons: {', '.join(reasons)}")
         
-        return valid_pois, stats
+        return valid_pois, reason_counts
     
     def generate_report(self, stats: Dict) -> str:
         """Generate a human-readable validation report"""
@@ -192,6 +279,9 @@ class EnhancedDataQualityValidator(DataQualityValidator):
     Extended validator with additional quality checks
     """
     
+    # Duplicate markers in names, fused into one case-insensitive alternation
+    _DUPLICATE_RE = re.compile(r'\((?:duplicate|copy|2|old)\)', re.IGNORECASE)
+    
     def __init__(self):
         super().__init__()
         
@@ -258,20 +348,18 @@ class EnhancedDataQualityValidator(DataQualityValidator):
     def _is_likely_duplicate(self, poi: Dict) -> bool:
         """Detect likely duplicate entries"""
         # Check for duplicate indicators in name
-        name = poi.get('name', '').lower()
-        
-        duplicate_indicators = [
-            r'\(duplicate\)',
-            r'\(copy\)',
-            r'\(2\)',
-            r'\(old\)',
-        ]
-        
-        for pattern in duplicate_indicators:
-            if re.search(pattern, name):
-                return True
-        
-        return False
+        return self._DUPLICATE_RE.search(poi.get('name', '')) is not None
+
+
+# Validators keep no per-batch state, so the convenience functions share one of each
+_DEFAULT_VALIDATORS = {
+    True: EnhancedDataQualityValidator(),
+    False: DataQualityValidator(),
+}
+
+def default_validator(enhanced: bool = True) -> DataQualityValidator:
+    """Shared validator instance, enhanced or basic"""
+    return _DEFAULT_VALIDATORS[bool(enhanced)]
 
 
 # Convenience function for quick validation
@@ -286,5 +374,4 @@ def validate_pois(pois: List[Dict], enhanced: bool = True) -> Tuple[List[Dict],
     Returns:
         (valid_pois, stats) - Filtered POIs and validation statistics
     """
-    validator = EnhancedDataQualityValidator() if enhanced else DataQualityValidator()
-    return validator.validate_batch(pois)
+    return default_validator(enhanced).validate_batch(pois)
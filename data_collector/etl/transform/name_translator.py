@@ -3,9 +3,12 @@ Name Translation and Transliteration System
 Converts non-English POI names to English using OSM tags and transliteration
 """
 
-import re
 import logging
-from typing import Optional, Dict
+from collections import Counter
+from typing import Optional, Dict, Tuple
+from etl.transform.data_quality_validator import (
+    DataQualityValidator, default_validator, detect_script, is_english, process_count, process_pool, split_batch
+)
 
 logger = logging.getLogger("NameTranslator")
 
@@ -19,6 +22,9 @@ class NameTranslator:
     3. Return None if translation fails
     """
     
+    # OSM tags that may carry an English name, in order of preference
+    _EN_TAGS = ('name:en', 'int_name', 'name_en', 'official_name:en')
+    
     def __init__(self):
         # Georgian to Latin transliteration map
         self.georgian_map = {
@@ -47,9 +53,9 @@ class NameTranslator:
             'Э': 'E', 'Ю': 'Yu', 'Я': 'Ya'
         }
         
-        # Script detection patterns
-        self.georgian_pattern = re.compile(r'[\u10A0-\u10FF]')
-        self.cyrillic_pattern = re.compile(r'[\u0400-\u04FF]')
+        # str.translate tables built from the maps above, so transliteration runs in one C loop
+        self._georgian_table = str.maketrans(self.georgian_map)
+        self._cyrillic_table = str.maketrans(self.cyrillic_map)
         
     def translate_poi_name(self, poi: Dict) -> Optional[str]:
         """
@@ -66,36 +72,42 @@ class NameTranslator:
         Returns:
             English name or None if translation fails
         """
+        return self._translate(poi)[0]
+    
+    def _translate(self, poi: Dict) -> Tuple[Optional[str], str]:
+        """
+        translate_poi_name, plus how the name was obtained:
+        'osm_english', 'transliterated' or 'failed' (the get_translation_stats buckets)
+        """
         original_name = poi.get('name', '').strip()
         tags = poi.get('tags', {})
         
         if not original_name:
-            return None
+            return None, 'failed'
         
         # 1. Check for OSM English name tag
         english_name = self._get_osm_english_name(tags)
         if english_name:
             logger.debug(f"Using OSM name:en: {original_name} → {english_name}")
-            return english_name
+            return english_name, 'osm_english'
         
         # 2. Try transliteration
         transliterated = self._transliterate(original_name)
         if transliterated and transliterated != original_name:
             logger.debug(f"Transliterated: {original_name} → {transliterated}")
-            return transliterated
+            return transliterated, 'transliterated'
         
         # 3. Translation failed
         logger.debug(f"Translation failed for: {original_name}")
-        return None
+        return None, 'failed'
     
     def _get_osm_english_name(self, tags: Dict) -> Optional[str]:
         """Extract English name from OSM tags"""
         # Try various English name tags
-        english_tags = ['name:en', 'int_name', 'name_en', 'official_name:en']
-        
-        for tag in english_tags:
-            if tag in tags and tags[tag].strip():
-                return tags[tag].strip()
+        for tag in self._EN_TAGS:
+            value = tags.get(tag)
+            if value and (value := value.strip()):
+                return value
         
         return None
     
@@ -106,10 +118,11 @@ class NameTranslator:
         Returns:
             Transliterated text or None if script not supported
         """
-        # Detect script
-        if self.georgian_pattern.search(text):
+        # Detect script (Georgian wins over Cyrillic in mixed names)
+        script = detect_script(text)
+        if script == 'georgian':
             return self._transliterate_georgian(text)
-        elif self.cyrillic_pattern.search(text):
+        elif script == 'cyrillic':
             return self._transliterate_cyrillic(text)
         
         # Already in Latin or unsupported script
@@ -117,27 +130,12 @@ class NameTranslator:
     
     def _transliterate_georgian(self, text: str) -> str:
         """Transliterate Georgian to Latin"""
-        result = []
-        for char in text:
-            if char in self.georgian_map:
-                result.append(self.georgian_map[char])
-            else:
-                result.append(char)
-        
-        transliterated = ''.join(result)
         # Capitalize first letter
-        return transliterated.capitalize() if transliterated else transliterated
+        return text.translate(self._georgian_table).capitalize()
     
     def _transliterate_cyrillic(self, text: str) -> str:
         """Transliterate Cyrillic to Latin"""
-        result = []
-        for char in text:
-            if char in self.cyrillic_map:
-                result.append(self.cyrillic_map[char])
-            else:
-                result.append(char)
-        
-        return ''.join(result)
+        return text.translate(self._cyrillic_table)
     
     def get_translation_stats(self, pois: list) -> Dict:
         """
@@ -159,7 +157,7 @@ class NameTranslator:
             tags = poi.get('tags', {})
             
             # Check if already English
-            if re.match(r'^[A-Za-z0-9\s\-\'\.\,\&\(\)]+$', original_name):
+            if is_english(original_name):
                 stats['already_english'] += 1
                 continue
             
@@ -178,10 +176,15 @@ class NameTranslator:
         return stats
 
 
-# Convenience function
+# The translator keeps no per-batch state, so the convenience functions share one
+_DEFAULT_TRANSLATOR = NameTranslator()
+
+
+# Convenience functions
 def translate_poi_names(pois: list) -> tuple:
     """
     Translate POI names to English.
+    Translated POIs are updated in place, with the old name kept as 'original_name'.
     
     Args:
         pois: List of POI dictionaries
@@ -189,25 +192,119 @@ def translate_poi_names(pois: list) -> tuple:
     Returns:
         (translated_pois, stats) - POIs with English names and translation stats
     """
-    translator = NameTranslator()
-    translated_pois = []
+    translated_pois, stats, _, _ = _run_chunks(pois)
+    return translated_pois, stats
+
+
+def translate_and_validate_pois(pois: list, enhanced: bool = True) -> tuple:
+    """
+    translate_poi_names followed by validate_pois, in a single pass over the POIs.
+    Like translate_poi_names, translated POIs are updated in place.
+    
+    Args:
+        pois: List of POI dictionaries
+        enhanced: Use enhanced validator (default: True)
+    
+    Returns:
+        (valid_pois, translation_stats, validation_stats) - the validation stats'
+        total is the number of POIs that came out of translation
+    """
+    validator = default_validator(enhanced)
+    valid_pois, translation_stats, translated_count, reason_counts = _run_chunks(pois, validator)
+    validation_stats = {
+        'total': translated_count,
+        'valid': len(valid_pois),
+        'rejected': translated_count - len(valid_pois),
+        'rejection_reasons': dict(reason_counts)
+    }
+    return valid_pois, translation_stats, validation_stats
+
+
+def _run_chunks(pois: list, validator: Optional[DataQualityValidator] = None) -> tuple:
+    """Run _translate_chunk over pois, in worker processes for large batches, merging results in input order"""
+    processes = process_count(len(pois))
+    if processes <= 1:
+        return _translate_chunk(pois, validator)
     
-    for poi in pois:
+    kept_pois = []
+    stats = {}
+    translated_count = 0
+    reason_counts = Counter()
+    chunks = split_batch(pois, processes)
+    with process_pool(processes) as pool:
+        results = pool.starmap(_translate_chunk_in_worker, [(chunk, validator) for chunk in chunks])
+        for chunk, (kept, renamed, chunk_stats, chunk_translated, chunk_reasons) in zip(chunks, results):
+            # Workers translated copies; apply their renames to the caller's POIs
+            for i, english_name in renamed:
+                poi = chunk[i]
+                poi['original_name'] = poi.get('name')
+                poi['name'] = english_name
+            kept_pois.extend(chunk[i] for i in kept)
+            for key, count in chunk_stats.items():
+                stats[key] = stats.get(key, 0) + count
+            translated_count += chunk_translated
+            reason_counts.update(chunk_reasons)
+    return kept_pois, stats, translated_count, reason_counts
+
+
+def _translate_chunk_in_worker(pois: list, validator: Optional[DataQualityValidator] = None) -> tuple:
+    """
+    _translate_chunk for a pool worker, whose POIs are copies of the caller's.
+    
+    Returns:
+        (kept_positions, [(position, english_name)], translation_stats, translated_count, rejection_reason_counts)
+    """
+    renamed = []
+    kept_pois, stats, translated_count, reason_counts = _translate_chunk(pois, validator, renamed)
+    position = {id(poi): i for i, poi in enumerate(pois)}
+    return [position[id(poi)] for poi in kept_pois], renamed, stats, translated_count, reason_counts
+
+
+def _translate_chunk(pois: list, validator: Optional[DataQualityValidator] = None, renamed: Optional[list] = None) -> tuple:
+    """
+    Translate one chunk of POIs in-process, collecting get_translation_stats counts as it goes.
+    With a validator, each translated POI is validated straight away and only valid ones are kept.
+    With a renamed list, (position, english_name) is appended for every POI renamed.
+    
+    Returns:
+        (kept_pois, translation_stats, translated_count, rejection_reason_counts)
+    """
+    translator = _DEFAULT_TRANSLATOR
+    kept_pois = []
+    translated_count = 0
+    reason_counts = Counter()
+    stats = {
+        'total': len(pois),
+        'osm_english': 0,
+        'transliterated': 0,
+        'failed': 0,
+        'already_english': 0
+    }
+    
+    for i, poi in enumerate(pois):
+        original_name = poi.get('name', '')
+        already_english = is_english(original_name)
+        
         # Try to get English name
-        english_name = translator.translate_poi_name(poi)
+        english_name, source = translator._translate(poi)
+        stats['already_english' if already_english else source] += 1
         
         if english_name:
-            # Update POI with English name
-            poi_copy = poi.copy()
-            poi_copy['name'] = english_name
-            poi_copy['original_name'] = poi.get('name')  # Preserve original
-            translated_pois.append(poi_copy)
-        else:
-            # Keep original if already English or translation succeeded
-            original_name = poi.get('name', '')
-            if re.match(r'^[A-Za-z0-9\s\-\'\.\,\&\(\)]+$', original_name):
-                translated_pois.append(poi)
+            # Update POI with English name, in place
+            poi['original_name'] = poi.get('name')  # Preserve original
+            poi['name'] = english_name
+            if renamed is not None:
+                renamed.append((i, english_name))
+        elif not already_english:
             # Otherwise, POI will be filtered out by validation
+            continue
+        translated_count += 1
+        
+        if validator is not None:
+            is_valid, reasons = validator.validate_poi(poi)
+            if not is_valid:
+                reason_counts.update(reasons)
+                continue
+        kept_pois.append(poi)
     
-    stats = translator.get_translation_stats(pois)
-    return translated_pois, stats
+    return kept_pois, stats, translated_count, reason_counts
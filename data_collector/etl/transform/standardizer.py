@@ -1,15 +1,22 @@
-import json
+import gzip
+import itertools
 import logging
+import math
 import os
 from pathlib import Path
-from typing import Dict, List, Set
-import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Set
 from datetime import datetime
-from etl.transform.data_quality_validator import validate_pois
-from etl.transform.name_translator import translate_poi_names
+from config.cities_config import normalize
+from utils import json_utils
+from etl.transform.name_translator import translate_and_validate_pois
 
 logger = logging.getLogger("Standardizer")
 
+# Dedup grid cells per degree (0.001° ≈ 110 m of latitude). POIs with the same name and
+# category in the same or an adjacent cell are treated as one place.
+_DEDUP_CELLS_PER_DEGREE = 1000
+_NEIGHBOUR_OFFSETS = tuple((dlat, dlon) for dlat in (-1, 0, 1) for dlon in (-1, 0, 1))
+
 class Standardizer:
     """
     Transforms Bronze data into Silver (Cleaned & Normalized).
@@ -23,7 +30,7 @@ class Standardizer:
         """
         Reads latest Bronze data, cleans it, and saves to Silver.
         """
-        city_key = city_name.lower().replace(" ", "_")
+        city_key = normalize(city_name)
         city_bronze_path = self.bronze_dir / city_key
         
         if not city_bronze_path.exists():
@@ -39,23 +46,19 @@ class Standardizer:
         latest_harvest = city_bronze_path / timestamps[0]
         logger.info(f"Processing latest harvest: {latest_harvest}")
         
-        # Load all tiles
-        raw_elements = []
-        for tile_file in latest_harvest.glob("tile_*.json"):
-            with open(tile_file, 'r') as f:
-                data = json.load(f)
-                raw_elements.extend(data.get('elements', []))
-                
-        logger.info(f"Loaded {len(raw_elements)} raw elements")
+        # Transform, streaming elements from the tiles rather than loading them all first.
+        # zip stops on the elements before drawing from the counter, so it ends at the element count.
+        counter = itertools.count()
+        cleaned_pois = self._process_elements(el for el, _ in zip(self._iter_elements(latest_harvest), counter))
+        raw_count = next(counter)
         
-        # Transform
-        cleaned_pois = self._process_elements(raw_elements)
+        logger.info(f"Loaded {raw_count} raw elements")
         
         # Deduplicate
         unique_pois = self._deduplicate(cleaned_pois)
         
-        # ✨ NEW: Name Translation
-        translated_pois, translation_stats = translate_poi_names(unique_pois)
+        # ✨ Name Translation + Data Quality Validation, in one pass over the POIs
+        validated_pois, translation_stats, validation_stats = translate_and_validate_pois(unique_pois, enhanced=True)
         
         logger.info(f"🌍 Translation Results:")
         logger.info(f"  Total: {translation_stats['total']}")
@@ -64,9 +67,6 @@ class Standardizer:
         logger.info(f"  Transliterated: {translation_stats['transliterated']}")
         logger.info(f"  Failed: {translation_stats['failed']}")
         
-        # ✨ Data Quality Validation
-        validated_pois, validation_stats = validate_pois(translated_pois, enhanced=True)
-        
         logger.info(f"📊 Validation Results:")
         logger.info(f"  Total: {validation_stats['total']}")
         logger.info(f"  Valid: {validation_stats['valid']} ({validation_stats['valid']/validation_stats['total']*100:.1f}%)")
@@ -81,29 +81,40 @@ class Standardizer:
         output_dir = self.silver_dir / city_key
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Compact: pois.json is read by the enrichers, not by people; metadata.json stays indented
         output_file = output_dir / "pois.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_pois, f, indent=2, ensure_ascii=False)
+        json_utils.write_json(output_file, validated_pois)
             
         # Save metadata
         metadata = {
             "city": city_name,
             "source_harvest": timestamps[0],
             "processed_at": datetime.now().isoformat(),
-            "raw_count": len(raw_elements),
+            "raw_count": raw_count,
             "clean_count": len(unique_pois),
-            "translated_count": len(translated_pois),
+            "translated_count": validation_stats['total'],
             "translation_stats": translation_stats,
             "validated_count": len(validated_pois),
             "validation_stats": validation_stats
         }
-        with open(output_dir / "metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        json_utils.write_json(output_dir / "metadata.json", metadata, pretty=True)
             
         logger.info(f"✅ Silver transformation complete for {city_name}. Saved {len(validated_pois)} validated POIs.")
         return True
 
-    def _process_elements(self, elements: List[Dict]) -> List[Dict]:
+    def _iter_elements(self, harvest_dir: Path) -> Iterator[Dict]:
+        """Yields the raw OSM elements of every tile in a harvest."""
+        for tile_file in harvest_dir.glob("tile_*.json*"):
+            if '.jsonl' in tile_file.suffixes:
+                yield from json_utils.read_jsonl(tile_file)
+                continue
+            # Older harvests saved each tile as one Overpass response, gzipped or plain
+            raw = tile_file.read_bytes()
+            if tile_file.suffix == '.gz':
+                raw = gzip.decompress(raw)
+            yield from json_utils.loads(raw).get('elements', ())
+
+    def _process_elements(self, elements: Iterable[Dict]) -> List[Dict]:
         """Converts OSM elements to internal POI schema."""
         pois = []
         for el in elements:
@@ -122,9 +133,13 @@ class Standardizer:
             elif 'historic' in tags:
                 category = "historic"
                 
-            # Coordinates
-            lat = el.get('lat') or el.get('center', {}).get('lat')
-            lon = el.get('lon') or el.get('center', {}).get('lon')
+            # Coordinates; only ways/relations fall back to their center
+            lat = el.get('lat')
+            lon = el.get('lon')
+            if not (lat and lon):
+                center = el.get('center', {})
+                lat = lat or center.get('lat')
+                lon = lon or center.get('lon')
             
             if not lat or not lon:
                 continue
@@ -134,22 +149,21 @@ class Standardizer:
             
             # Build address from components
             address_parts = []
-            if tags.get('addr:street'):
-                street = tags.get('addr:street')
+            if street := tags.get('addr:street'):
                 housenumber = tags.get('addr:housenumber', '')
                 address_parts.append(f"{housenumber} {street}".strip())
-            if tags.get('addr:city'):
-                address_parts.append(tags.get('addr:city'))
+            if addr_city := tags.get('addr:city'):
+                address_parts.append(addr_city)
             address = ', '.join(address_parts) if address_parts else None
             
-            # Extract contact information
+            # Extract contact information (each tag looked up once)
             contact = {}
-            if tags.get('phone') or tags.get('contact:phone') or tags.get('contact:mobile'):
-                contact['phone'] = tags.get('phone') or tags.get('contact:phone') or tags.get('contact:mobile')
-            if tags.get('email') or tags.get('contact:email'):
-                contact['email'] = tags.get('email') or tags.get('contact:email')
-            if tags.get('website') or tags.get('contact:website'):
-                contact['website'] = tags.get('website') or tags.get('contact:website')
+            if phone := tags.get('phone') or tags.get('contact:phone') or tags.get('contact:mobile'):
+                contact['phone'] = phone
+            if email := tags.get('email') or tags.get('contact:email'):
+                contact['email'] = email
+            if website := tags.get('website') or tags.get('contact:website'):
+                contact['website'] = website
             
             # Extract wikidata/wikimedia for photos
             wikidata = tags.get('wikidata')
@@ -177,14 +191,18 @@ class Standardizer:
         return pois
 
     def _deduplicate(self, pois: List[Dict]) -> List[Dict]:
-        """Simple deduplication by name and proximity (simplified)."""
-        # For now, just dedup by name + category to keep it fast
-        # In production, use spatial deduplication
+        """Deduplication by name, category and proximity."""
+        # Hash grid: each POI checks its own and the 8 surrounding cells, so this stays O(n)
+        # and same-named places in different parts of the city (e.g. chain cafes) are kept
         seen = set()
         unique = []
         for p in pois:
-            key = (p['name'].lower(), p['category'])
-            if key not in seen:
-                seen.add(key)
-                unique.append(p)
+            name = p['name'].casefold()
+            category = p['category']
+            cell_lat = math.floor(float(p['lat']) * _DEDUP_CELLS_PER_DEGREE)
+            cell_lon = math.floor(float(p['lon']) * _DEDUP_CELLS_PER_DEGREE)
+            if any((name, category, cell_lat + dlat, cell_lon + dlon) in seen for dlat, dlon in _NEIGHBOUR_OFFSETS):
+                continue
+            seen.add((name, category, cell_lat, cell_lon))
+            unique.append(p)
         return unique
@@ -0,0 +1,6 @@
+-- One activity per name per destination.
+-- Lets seed_tourism_activities.py upsert with on_conflict='destination_id,name'
+-- instead of checking for existing rows first.
+
+CREATE UNIQUE INDEX IF NOT EXISTS activities_dest_name_uniq
+    ON public.activities (destination_id, name);
@@ -0,0 +1,17 @@
+-- Insert a batch of seed activities in one call, skipping any
+-- (destination_id, name) pair that already exists.
+-- Used by seed_tourism_activities.py via db.client.rpc('seed_activities_bulk', ...)
+-- Requires activities_dest_name_uniq (002).
+
+CREATE OR REPLACE FUNCTION public.seed_activities_bulk(payload jsonb)
+RETURNS TABLE (destination_id uuid, name text)
+LANGUAGE sql
+AS $$
+    INSERT INTO public.activities
+        (destination_id, name, description, category, location, tags, best_time, duration, price_range)
+    SELECT
+        i.destination_id, i.name, i.description, i.category, i.location, i.tags, i.best_time, i.duration, i.price_range
+    FROM jsonb_populate_recordset(NULL::public.activities, payload) AS i
+    ON CONFLICT (destination_id, name) DO NOTHING
+    RETURNING activities.destination_id, activities.name;
+$$;
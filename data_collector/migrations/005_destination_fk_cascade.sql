@@ -0,0 +1,34 @@
+-- Cascade destination deletes to activities and destination_details,
+-- so cleaning a city is a single DELETE on byd_esp.destinations.
+
+BEGIN;
+
+-- Drop the existing destination_id FKs by looking their names up, since they
+-- need not have the Postgres default *_destination_id_fkey names
+DO $$
+DECLARE
+    fk record;
+BEGIN
+    FOR fk IN
+        SELECT c.conrelid::regclass AS table_name, c.conname
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+        WHERE c.contype = 'f'
+          AND c.confrelid = 'byd_esp.destinations'::regclass
+          AND c.conrelid IN ('byd_esp.activities'::regclass, 'byd_esp.destination_details'::regclass)
+          AND a.attname = 'destination_id'
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.table_name, fk.conname);
+    END LOOP;
+END
+$$;
+
+ALTER TABLE byd_esp.activities
+    ADD CONSTRAINT activities_dest_fk
+        FOREIGN KEY (destination_id) REFERENCES byd_esp.destinations (id) ON DELETE CASCADE;
+
+ALTER TABLE byd_esp.destination_details
+    ADD CONSTRAINT destination_details_dest_fk
+        FOREIGN KEY (destination_id) REFERENCES byd_esp.destinations (id) ON DELETE CASCADE;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- One activity per OSM element per destination in byd_esp.
+-- Lets SupabaseLoader upsert activities with on_conflict='destination_id,osm_id'
+-- so re-loading a city updates rows instead of duplicating them.
+-- Keyed by osm_id rather than name: same-named places in one city
+-- (chain cafes, several churches of the same dedication) stay separate rows.
+
+BEGIN;
+
+ALTER TABLE byd_esp.activities ADD COLUMN IF NOT EXISTS osm_id TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS activities_dest_osm_id_uniq
+    ON byd_esp.activities (destination_id, osm_id);
+
+-- Made redundant by this migration, where an earlier revision of it created them
+DROP INDEX IF EXISTS byd_esp.activities_dest_name_uniq;
+DROP INDEX IF EXISTS byd_esp.idx_activities_dest_name;
+
+COMMIT;
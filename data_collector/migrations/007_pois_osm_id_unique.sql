@@ -0,0 +1,16 @@
+-- One POI per OSM element.
+-- Lets Database.save_pois upsert with on_conflict='osm_id' in a single request
+-- per batch, instead of falling back to select-then-insert (_save_pois_manual_dedup).
+
+BEGIN;
+
+-- Drop duplicates left by earlier insert-only loads, keeping the oldest row
+DELETE FROM public.pois a
+USING public.pois b
+WHERE a.osm_id = b.osm_id
+  AND a.ctid > b.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS pois_osm_id_uniq
+    ON public.pois (osm_id);
+
+COMMIT;
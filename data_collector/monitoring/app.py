@@ -8,6 +8,7 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from orchestrator import Orchestrator
+from config.cities_config import normalize
 
 st.set_page_config(
     page_title="Data Collector ETL Dashboard",
@@ -20,23 +21,30 @@ st.title("🌍 Data Collector ETL Dashboard")
 # Initialize Orchestrator
 orch = Orchestrator()
 
+@st.cache_data(ttl=30)
+def _pipeline_status():
+    """Layer file counts; cached so widget interactions don't re-walk the layer directories"""
+    return orch.get_pipeline_status()
+
 # Sidebar
 st.sidebar.header("Pipeline Controls")
 selected_city = st.sidebar.selectbox("Select City", ["Tbilisi", "Baku", "Bangkok"]) # TODO: Load from config
 
 if st.sidebar.button("Refresh Status"):
+    _pipeline_status.clear()
     st.rerun()
 
 # Main Dashboard
 col1, col2, col3 = st.columns(3)
 
-status = orch.get_pipeline_status()
+status = _pipeline_status()
 
 with col1:
     st.metric("Bronze Layer (Raw)", f"{status['bronze']} Files")
     if st.button("Run Harvest (Bronze)"):
         with st.spinner(f"Harvesting {selected_city}..."):
             orch.run_bronze_layer(selected_city)
+            _pipeline_status.clear()
             st.success("Harvest Started!")
 
 with col2:
@@ -44,6 +52,7 @@ with col2:
     if st.button("Run Transform (Silver)"):
         with st.spinner(f"Transforming {selected_city}..."):
             orch.run_silver_layer(selected_city)
+            _pipeline_status.clear()
             st.success("Transformation Started!")
 
 with col3:
@@ -51,6 +60,7 @@ with col3:
     if st.button("Run Enrich (Gold)"):
         with st.spinner(f"Enriching {selected_city}..."):
             orch.run_gold_layer(selected_city)
+            _pipeline_status.clear()
             st.success("Enrichment Started!")
             
     if st.button("🚀 Load to DB"):
@@ -71,7 +81,7 @@ with st.sidebar.form("manual_poi_form"):
     if st.form_submit_button("Add POI"):
         if m_name:
             # Save to manual_pois.json in Silver layer
-            city_key = selected_city.lower().replace(" ", "_")
+            city_key = normalize(selected_city)
             silver_path = Path(f"layers/silver/{city_key}")
             silver_path.mkdir(parents=True, exist_ok=True)
             manual_file = silver_path / "manual_pois.json"
@@ -104,23 +114,16 @@ st.sidebar.subheader("📂 Upload CSV")
 uploaded_file = st.sidebar.file_uploader("Upload POIs (CSV)", type=['csv'])
 if uploaded_file is not None:
     if st.sidebar.button("Process CSV"):
-        # Save temp file
-        temp_path = Path(f"temp_{uploaded_file.name}")
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-            
-        # Process
+        # Process straight from the in-memory upload; no temp file to write and clean up
         from etl.transform.csv_standardizer import CSVStandardizer
         silver_dir = Path("layers/silver")
         standardizer = CSVStandardizer(silver_dir)
         
-        if standardizer.process_csv(temp_path, selected_city):
+        uploaded_file.seek(0)
+        if standardizer.process_csv(uploaded_file, selected_city):
             st.sidebar.success(f"Processed {uploaded_file.name}!")
         else:
             st.sidebar.error("Failed to process CSV")
-            
-        # Cleanup
-        temp_path.unlink()
 
 # Recent Logs
 st.subheader("Recent Logs")
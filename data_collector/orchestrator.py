@@ -1,6 +1,9 @@
 import os
 import json
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -16,13 +19,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Orchestrator")
 
+# Tells a pipeline stage worker that no more cities are coming
+_DONE = None
+
+# Polite delay after each Bronze harvest before the next one hits Overpass
+_HARVEST_PAUSE_SECONDS = 2
+
 class Orchestrator:
     """
     Manages the ETL pipeline execution and state.
     """
     
-    def __init__(self, base_dir: str = "."):
+    def __init__(self, base_dir: str = ".", use_cache: bool = True):
         self.base_dir = Path(base_dir)
+        # Set to False to bypass the on-disk Ollama response cache
+        self.use_cache = use_cache
         self.layers_dir = self.base_dir / "layers"
         self.bronze_dir = self.layers_dir / "bronze"
         self.silver_dir = self.layers_dir / "silver"
@@ -44,45 +55,133 @@ class Orchestrator:
 
     def _count_files(self, directory: Path) -> int:
         """Counts files in a directory recursively."""
-        return sum(1 for _ in directory.rglob('*') if _.is_file())
+        # os.scandir entries carry their file type from the directory read, so unlike
+        # rglob + is_file this needs no stat() per file
+        total = 0
+        stack = [directory]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        total += 1
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        return total
 
-    def run_bronze_layer(self, city: str):
-        """Trigger Bronze Layer extraction."""
+    def run_bronze_layer(self, city: str) -> bool:
+        """Trigger Bronze Layer extraction. Returns False if no tile could be fetched."""
         logger.info(f"Starting Bronze Layer extraction for {city}...")
         from etl.extract.osm_extractor import OSMExtractor
         extractor = OSMExtractor(self.bronze_dir)
-        extractor.extract_city(city)
+        return extractor.extract_city(city)
 
-    def run_silver_layer(self, city: str):
-        """Trigger Silver Layer transformation."""
+    def run_silver_layer(self, city: str) -> bool:
+        """Trigger Silver Layer transformation. Returns False if the city could not be transformed."""
         logger.info(f"Starting Silver Layer transformation for {city}...")
         from etl.transform.standardizer import Standardizer
         standardizer = Standardizer(self.bronze_dir, self.silver_dir)
-        standardizer.process_city(city)
+        return standardizer.process_city(city)
 
-    def run_gold_layer(self, city_name: str):
+    def run_gold_layer(self, city_name: str) -> bool:
         """
         Runs Gold Layer:
         1. POI Enrichment (AIEnricher)
         2. Destination Enrichment (DestinationEnricher)
+        
+        Returns False if either step failed.
         """
         logger.info(f"Starting Gold Layer enrichment for {city_name}...")
         
         # 1. POI Enrichment
         from etl.enrich.ai_enricher import AIEnricher
-        poi_enricher = AIEnricher(self.silver_dir, self.gold_dir)
-        poi_enricher.process_city(city_name)
+        poi_enricher = AIEnricher(self.silver_dir, self.gold_dir, use_cache=self.use_cache)
+        pois_ok = poi_enricher.process_city(city_name)
         
         # 2. Destination Enrichment
         from etl.enrich.destination_enricher import DestinationEnricher
-        dest_enricher = DestinationEnricher(self.gold_dir)
-        dest_enricher.enrich_destination(city_name)
+        dest_enricher = DestinationEnricher(self.gold_dir, use_cache=self.use_cache)
+        destination_ok = dest_enricher.enrich_destination(city_name)
         
+        if not (pois_ok and destination_ok):
+            logger.error(f"❌ Gold Layer incomplete for {city_name}")
+            return False
         logger.info(f"✅ Gold Layer (POI + Destination) complete for {city_name}")
+        return True
 
-    def run_load_layer(self, city_name: str):
+    def run_load_layer(self, city_name: str) -> bool:
         """Trigger Loading to Supabase."""
         logger.info(f"Starting Load Layer for {city_name}...") # Changed `city` to `city_name`
         from etl.load.supabase_loader import SupabaseLoader
         loader = SupabaseLoader(self.gold_dir)
-        loader.load_gold_layer(city_name)
+        return loader.load_gold_layer(city_name)
+
+    def run_pipelined(self, cities: List[str], bronze_workers: int = 1) -> Dict[str, Dict]:
+        """
+        Runs Bronze → Silver → Gold → Load for several cities as a pipeline.
+        Each layer has its own worker thread(s) fed by a bounded queue, so one city is
+        enriched while the next is still being harvested; a city whose layer raises
+        or returns False is not passed on to the next one.
+        
+        Each Bronze worker's OSMExtractor already keeps two Overpass queries in flight,
+        which is all the slots Overpass grants a client, so bronze_workers > 1 only
+        makes sense against a private Overpass instance.
+        
+        Returns:
+            {city: {'status', 'duration', ['error']}} for every city
+        """
+        def run_bronze_layer(city: str) -> bool:
+            ok = self.run_bronze_layer(city)
+            time.sleep(_HARVEST_PAUSE_SECONDS)
+            return ok
+        
+        stages = [
+            (run_bronze_layer, bronze_workers),  # network bound (Overpass)
+            (self.run_silver_layer, 1),
+            (self.run_gold_layer, 1),  # one local LLM; more workers would only queue on it
+            (self.run_load_layer, 1),
+        ]
+        # maxsize=2 gives backpressure: a fast layer can only get two cities ahead of a slow one
+        queues = [queue.Queue()] + [queue.Queue(maxsize=2) for _ in stages[1:]] + [None]
+        started = {}
+        results = {}
+        lock = threading.Lock()
+        
+        def worker(step, in_q, out_q):
+            while (city := in_q.get()) is not _DONE:
+                try:
+                    ok = step(city)
+                    error = None if ok else f"{step.__name__} reported failure"
+                except Exception as e:
+                    error = str(e)
+                if error is not None:
+                    logger.error(f"❌ Failed to process {city}: {error}")
+                    with lock:
+                        results[city] = {'status': 'failed', 'duration': time.monotonic() - started[city], 'error': error}
+                    continue
+                if out_q is not None:
+                    out_q.put(city)
+                else:
+                    with lock:
+                        results[city] = {'status': 'success', 'duration': time.monotonic() - started[city]}
+        
+        threads = []
+        for i, (step, workers) in enumerate(stages):
+            threads.append([
+                threading.Thread(target=worker, args=(step, queues[i], queues[i + 1]), name=f"{step.__name__}-{n}", daemon=True)
+                for n in range(workers)
+            ])
+        for stage_threads in threads:
+            for t in stage_threads:
+                t.start()
+        
+        for city in cities:
+            started[city] = time.monotonic()
+            queues[0].put(city)
+        # A stage is told to stop only once every worker of the stage before it has finished
+        for i, stage_threads in enumerate(threads):
+            for _ in stage_threads:
+                queues[i].put(_DONE)
+            for t in stage_threads:
+                t.join()
+        
+        return results
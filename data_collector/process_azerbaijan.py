@@ -46,50 +46,15 @@ def run_azerbaijan_pipeline():
         'stats': {}
     }
     
-    for i, city in enumerate(AZERBAIJAN_CITIES, 1):
-        print(f"\n{'='*80}")
-        print(f"🏙️  Processing {city} ({i}/{len(AZERBAIJAN_CITIES)})")
-        print(f"{'='*80}\n")
-        
-        city_start = datetime.now()
-        
-        try:
-            # Step 1: Bronze Layer (OSM Extraction)
-            print(f"\n📥 Step 1/4: Bronze Layer - Extracting OSM data for {city}")
-            orch.run_bronze_layer(city)
-            
-            # Step 2: Silver Layer (Translation + Validation)
-            print(f"\n🔄 Step 2/4: Silver Layer - Translating and validating data for {city}")
-            orch.run_silver_layer(city)
-            
-            # Step 3: Gold Layer (AI Enrichment)
-            print(f"\n✨ Step 3/4: Gold Layer - AI enrichment with Gemma 3 for {city}")
-            orch.run_gold_layer(city)
-            
-            # Step 4: Load Layer (Database)
-            print(f"\n📤 Step 4/4: Load Layer - Loading to Supabase for {city}")
-            orch.run_load_layer(city)
-            
-            city_duration = (datetime.now() - city_start).total_seconds()
-            
+    # Layers run as a pipeline: one city is enriched while the next is still being harvested
+    print(f"\n🏙️  Processing {len(AZERBAIJAN_CITIES)} cities through Bronze → Silver → Gold → Load\n")
+    results['stats'] = orch.run_pipelined(AZERBAIJAN_CITIES)
+    
+    for city in AZERBAIJAN_CITIES:
+        if results['stats'][city]['status'] == 'success':
             results['success'].append(city)
-            results['stats'][city] = {
-                'duration': city_duration,
-                'status': 'success'
-            }
-            
-            print(f"\n✅ {city} completed in {city_duration:.1f} seconds")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to process {city}: {e}")
+        else:
             results['failed'].append(city)
-            results['stats'][city] = {
-                'duration': (datetime.now() - city_start).total_seconds(),
-                'status': 'failed',
-                'error': str(e)
-            }
-            print(f"\n❌ {city} failed: {e}")
-            continue
     
     # Final summary
     total_duration = (datetime.now() - start_time).total_seconds()
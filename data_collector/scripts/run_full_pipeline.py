@@ -1,7 +1,7 @@
+import argparse
 import logging
 import sys
 import os
-import time
 from pathlib import Path
 
 # Add parent dir to path
@@ -29,39 +29,23 @@ GEORGIA_CITIES = [
     "Kutaisi"
 ]
 
-def run_pipeline():
-    orch = Orchestrator()
+def run_pipeline(use_cache: bool = True, bronze_workers: int = 1):
+    orch = Orchestrator(use_cache=use_cache)
     
     logger.info("🚀 Starting Production Pipeline Run for Georgia")
     
-    for city in GEORGIA_CITIES:
-        logger.info(f"\n{'='*50}\nProcessing {city}...\n{'='*50}")
-        
-        try:
-            # 1. Bronze Layer (Harvest)
-            logger.info(f"Step 1: Bronze Layer (Harvest) for {city}")
-            orch.run_bronze_layer(city)
-            time.sleep(2) # Polite delay
-            
-            # 2. Silver Layer (Transform)
-            logger.info(f"Step 2: Silver Layer (Transform) for {city}")
-            orch.run_silver_layer(city)
-            
-            # 3. Gold Layer (Enrich)
-            logger.info(f"Step 3: Gold Layer (Enrich) for {city}")
-            orch.run_gold_layer(city)
-            
-            # 4. Load Layer (Supabase)
-            logger.info(f"Step 4: Load Layer (Supabase) for {city}")
-            orch.run_load_layer(city)
-            
-            logger.info(f"✅ Successfully processed {city}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to process {city}: {e}")
-            continue
+    # Layers run as a pipeline: one city is enriched while the next is still being harvested
+    results = orch.run_pipelined(GEORGIA_CITIES, bronze_workers=bronze_workers)
+    for city, result in results.items():
+        if result['status'] == 'success':
+            logger.info(f"✅ Successfully processed {city} ({result['duration']:.1f}s)")
             
     logger.info("\n🎉 Pipeline Run Complete!")
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="Run the full pipeline for Georgia")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk Ollama response cache")
+    parser.add_argument("--bronze-workers", type=int, default=1,
+                        help="Cities to harvest from OSM at the same time (each uses two Overpass slots)")
+    args = parser.parse_args()
+    run_pipeline(use_cache=not args.no_cache, bronze_workers=args.bronze_workers)
@@ -1,7 +1,7 @@
 import logging
 import sys
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent dir to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,28 +28,40 @@ GEORGIA_CITIES = [
     "Kutaisi"
 ]
 
+def _load_city(orch: Orchestrator, city: str):
+    try:
+        # 4. Load Layer (Supabase)
+        logger.info(f"Step 2: Load Layer (Supabase) for {city}")
+        if orch.run_load_layer(city):
+            logger.info(f"✅ Successfully processed {city}")
+        else:
+            logger.error(f"❌ Failed to load {city}")
+    except Exception as e:
+        logger.error(f"❌ Failed to process {city}: {e}")
+
 def run_enrichment_load():
     orch = Orchestrator()
     
     logger.info("🚀 Starting Enrichment & Load Pipeline for Georgia (Remaining Cities)")
     
-    for city in GEORGIA_CITIES:
-        logger.info(f"\n{'='*50}\nProcessing {city}...\n{'='*50}")
-        
-        try:
-            # 3. Gold Layer (Enrich)
-            logger.info(f"Step 1: Gold Layer (Enrich) for {city}")
-            orch.run_gold_layer(city)
+    # Cities are enriched one at a time: each AIEnricher already keeps the single local
+    # model busy, and more cities would only queue requests at it. A city's Load (Supabase)
+    # runs in the background while the next city is enriched.
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        for city in GEORGIA_CITIES:
+            logger.info(f"\n{'='*50}\nProcessing {city}...\n{'='*50}")
             
-            # 4. Load Layer (Supabase)
-            logger.info(f"Step 2: Load Layer (Supabase) for {city}")
-            orch.run_load_layer(city)
-            
-            logger.info(f"✅ Successfully processed {city}")
+            try:
+                # 3. Gold Layer (Enrich)
+                logger.info(f"Step 1: Gold Layer (Enrich) for {city}")
+                if not orch.run_gold_layer(city):
+                    logger.error(f"❌ Failed to enrich {city}")
+                    continue
+            except Exception as e:
+                logger.error(f"❌ Failed to process {city}: {e}")
+                continue
             
-        except Exception as e:
-            logger.error(f"❌ Failed to process {city}: {e}")
-            continue
+            loader.submit(_load_city, orch, city)
             
     logger.info("\n🎉 Enrichment & Load Run Complete!")
 
@@ -3,13 +3,120 @@ OpenStreetMap Data Collector
 FREE, comprehensive data source for POIs, destinations, and more
 """
 
-import overpy
+import json
+import random
+import requests
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Iterator, Optional
 import logging
+from utils import json_utils
 
 logger = logging.getLogger(__name__)
 
+# Overpass answers with these when it is overloaded or a query ran out of time
+_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Mapping of POI types to OSM tags
+POI_TAGS = {
+    'temple': [
+        'amenity=place_of_worship', # Broadened for all religions
+        'building=temple',
+        'historic=temple',
+        'religion=buddhist',
+        'religion=hindu',
+        'religion=sikh',
+        'religion=muslim',
+        'religion=christian'
+    ],
+    'historic': [ # New category for landmarks
+        'historic=monument',
+        'historic=memorial',
+        'historic=fort',
+        'historic=castle',
+        'historic=ruins',
+        'tourism=attraction',
+        'historic=tomb'
+    ],
+    'beach': [
+        'natural=beach',
+        'natural=coastline'
+    ],
+    'market': [
+        'amenity=marketplace',
+        'amenity=market'
+    ],
+    'viewpoint': [
+        'tourism=viewpoint'
+    ],
+    'museum': [
+        'tourism=museum',
+        'amenity=arts_centre'
+    ],
+    'national_park': [
+        'boundary=national_park',
+        'leisure=nature_reserve'
+    ],
+    'waterfall': [
+        'waterway=waterfall',
+        'natural=waterfall'
+    ],
+    'palace': [
+        'historic=palace',
+        'historic=castle',
+        'building=palace'
+    ],
+    'island': [
+        'place=island'
+    ],
+    'restaurant': [
+        'amenity=restaurant'
+    ],
+    'hotel': [
+        'tourism=hotel',
+        'tourism=guest_house'
+    ]
+}
+
+
+def _compile_filter(tag: str) -> str:
+    """
+    Overpass filter for a POI_TAGS entry:
+    'religion=buddhist' -> '["religion"="buddhist"]', with ' AND ' joining several
+    """
+    return "".join([
+        f'[{json.dumps(key)}={json.dumps(value)}]'
+        for key, value in (part.split("=", 1) for part in tag.split(" AND "))
+    ])
+
+
+# POI_TAGS compiled to filters once, instead of on every query
+POI_TAG_FILTERS: Dict[str, List[str]] = {
+    poi_type: [_compile_filter(tag) for tag in tags] for poi_type, tags in POI_TAGS.items()
+}
+
+
+# Address tags, in the order _build_address joins them
+_ADDRESS_KEYS = ('addr:housenumber', 'addr:street', 'addr:city', 'addr:province')
+
+
+@lru_cache(maxsize=4096)
+def _parse_wikipedia(wikipedia_tag: Optional[str]) -> Optional[str]:
+    """Parse Wikipedia tag to URL (cached: large areas repeat the same tags)"""
+    if not wikipedia_tag:
+        return None
+
+    # Format: "en:Article Name" or "th:ชื่อบทความ"
+    if ':' in wikipedia_tag:
+        lang, article = wikipedia_tag.split(':', 1)
+        article = article.replace(' ', '_')
+        return f"https://{lang}.wikipedia.org/wiki/{article}"
+
+    return None
+
 
 class OSMCollector:
     """
@@ -20,7 +127,8 @@ class OSMCollector:
     def __init__(
         self,
         rate_limit_delay: float = 1.0,
-        timeout: int = 60
+        timeout: int = 60,
+        max_retries: int = 4
     ):
         """
         Initialize OSM collector
@@ -28,11 +136,19 @@ class OSMCollector:
         Args:
             rate_limit_delay: Seconds to wait between requests (be nice to OSM!)
             timeout: Query timeout in seconds
+            max_retries: Retries for a query Overpass fails transiently (overload, timeout)
         """
-        self.api = overpy.Overpass()
+        self.overpass_url = "https://overpass-api.de/api/interpreter"
+        # One keep-alive session for every query this collector sends
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
         self.rate_limit_delay = rate_limit_delay
         self.timeout = timeout
-        self.last_request_time = 0
+        self.max_retries = max_retries
+        # Earliest time.monotonic() at which the next request may go out
+        self._next_request_time = 0.0
+        # Lets threads share a collector: requests are spaced out, but responses can overlap
+        self._rate_lock = threading.Lock()
 
     def collect_pois_in_province(
         self,
@@ -55,6 +171,25 @@ class OSMCollector:
         Returns:
             List of POI data dicts
         """
+        pois = list(self.iter_pois_in_province(province_name, poi_type, country_code, admin_level, limit))
+        logger.info(f"Found {len(pois)} {poi_type}s in {province_name}")
+        return pois
+
+    def iter_pois_in_province(
+        self,
+        province_name: str,
+        poi_type: str,
+        country_code: str = "TH",
+        admin_level: int = 6,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Like collect_pois_in_province, but yields POIs one at a time,
+        so a consumer can start on them without a second full list being built
+
+        Yields:
+            POI data dicts
+        """
         logger.info(f"Collecting {poi_type}s in {province_name}, {country_code}")
 
         # Get OSM query tags for this POI type
@@ -62,7 +197,7 @@ class OSMCollector:
 
         if not tags:
             logger.warning(f"No OSM tags defined for POI type: {poi_type}")
-            return []
+            return
 
         # Build Overpass query
         query = self._build_province_query(
@@ -72,19 +207,14 @@ class OSMCollector:
             limit
         )
 
-        # Execute query with rate limiting
-        self._rate_limit()
-
+        # Execute query (rate limited)
         try:
-            result = self.api.query(query)
-            pois = self._parse_overpass_result(result, poi_type)
-
-            logger.info(f"Found {len(pois)} {poi_type}s in {province_name}")
-            return pois
-
+            result = self._post(query)
         except Exception as e:
             logger.error(f"Error querying OSM: {e}")
-            return []
+            return
+
+        yield from self._parse_overpass_result(result, poi_type)
 
     def collect_pois_in_bounding_box(
         self,
@@ -109,11 +239,9 @@ class OSMCollector:
 
         query = self._build_bbox_query(bbox, tags, limit)
 
-        self._rate_limit()
-
         try:
-            result = self.api.query(query)
-            return self._parse_overpass_result(result, poi_type)
+            result = self._post(query)
+            return list(self._parse_overpass_result(result, poi_type))
         except Exception as e:
             logger.error(f"Error querying OSM bbox: {e}")
             return []
@@ -135,48 +263,79 @@ class OSMCollector:
         """
         logger.info(f"Collecting destinations in {country_code}")
 
-        destinations = []
+        # All types in one query; each destination's type comes back in its place tag
+        place_filter = "|".join(destination_types)
+        query = f"""
+        [out:json][timeout:{self.timeout}];
+        area["ISO3166-1"="{country_code}"]->.country;
+        (
+          node["place"~"^({place_filter})$"](area.country);
+          way["place"~"^({place_filter})$"](area.country);
+        );
+        out center tags;
+        """
 
+        try:
+            result = self._post(query)
+            destinations = self._parse_destinations(result, country_code)
+        except Exception as e:
+            logger.error(f"Error collecting destinations: {e}")
+            return []
+
+        type_counts = Counter(dest['destination_type'] for dest in destinations)
         for dest_type in destination_types:
-            query = f"""
-            [out:json][timeout:{self.timeout}];
-            area["ISO3166-1"="{country_code}"]->.country;
-            (
-              node["place"="{dest_type}"](area.country);
-              way["place"="{dest_type}"](area.country);
-            );
-            out center tags;
-            """
+            logger.info(f"Found {type_counts[dest_type]} {dest_type}s")
 
-            self._rate_limit()
+        logger.info(f"Total destinations collected: {len(destinations)}")
+        return destinations
+
+    def _post(self, query: str) -> Dict[str, Any]:
+        """
+        Run an Overpass query and return the parsed JSON payload
 
+        Overload and timeout failures are retried with jittered exponential backoff,
+        since the same query usually succeeds a little later; anything else
+        (e.g. a 400 for a bad query) raises straight away.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._rate_limit()
             try:
-                result = self.api.query(query)
-                parsed = self._parse_destinations(result, dest_type, country_code)
-                destinations.extend(parsed)
-                logger.info(f"Found {len(parsed)} {dest_type}s")
-            except Exception as e:
-                logger.error(f"Error collecting {dest_type}s: {e}")
+                # Read timeout leaves room past the query's own [timeout:], so Overpass can answer first
+                response = self._session.post(
+                    self.overpass_url,
+                    data=query.encode("utf-8"),
+                    timeout=(10, self.timeout + 30)
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            else:
+                if response.status_code in _RETRY_STATUS_CODES:
+                    error = RuntimeError(f"Overpass returned HTTP {response.status_code}")
+                else:
+                    response.raise_for_status()
+                    payload = json_utils.loads(response.content)
 
-        logger.info(f"Total destinations collected: {len(destinations)}")
-        return destinations
+                    # Timeouts and out-of-memory come back as a 200 with a remark and partial data
+                    remark = payload.get("remark", "")
+                    if not remark.startswith("runtime error"):
+                        return payload
+                    error = RuntimeError(remark)
+
+            if attempt == self.max_retries:
+                raise error
+            delay = min(60, 2 ** attempt + random.uniform(0, 1))
+            logger.warning(f"{error}; retrying in {delay:.1f}s")
+            time.sleep(delay)
 
     def _build_province_query(
         self,
         province_name: str,
-        tags: List[str],
+        tag_filters: List[str],
         admin_level: int,
         limit: Optional[int]
     ) -> str:
         """Build Overpass query for province"""
 
-        # Build tag filters
-        tag_filters = []
-        for tag in tags:
-            parts = tag.split(" AND ")
-            filter_str = "".join([f'["{p.split("=")[0]}"="{p.split("=")[1]}"]' for p in parts])
-            tag_filters.append(filter_str)
-
         limit_str = f"({limit})" if limit else ""
 
         query = f"""
@@ -185,9 +344,11 @@ class OSMCollector:
         (
         """
 
-        for tag_filter in tag_filters:
-            query += f'  node{tag_filter}(area.province){limit_str};\n'
-            query += f'  way{tag_filter}(area.province){limit_str};\n'
+        query += "".join([
+            f'  {element}{tag_filter}(area.province){limit_str};\n'
+            for tag_filter in tag_filters
+            for element in ("node", "way")
+        ])
 
         query += """
         );
@@ -199,7 +360,7 @@ class OSMCollector:
     def _build_bbox_query(
         self,
         bbox: Dict[str, float],
-        tags: List[str],
+        tag_filters: List[str],
         limit: Optional[int]
     ) -> str:
         """Build Overpass query for bounding box"""
@@ -207,20 +368,16 @@ class OSMCollector:
         bbox_str = f"{bbox['south']},{bbox['west']},{bbox['north']},{bbox['east']}"
         limit_str = f"({limit})" if limit else ""
 
-        tag_filters = []
-        for tag in tags:
-            parts = tag.split(" AND ")
-            filter_str = "".join([f'["{p.split("=")[0]}"="{p.split("=")[1]}"]' for p in parts])
-            tag_filters.append(filter_str)
-
         query = f"""
         [out:json][timeout:{self.timeout}];
         (
         """
 
-        for tag_filter in tag_filters:
-            query += f'  node{tag_filter}({bbox_str}){limit_str};\n'
-            query += f'  way{tag_filter}({bbox_str}){limit_str};\n'
+        query += "".join([
+            f'  {element}{tag_filter}({bbox_str}){limit_str};\n'
+            for tag_filter in tag_filters
+            for element in ("node", "way")
+        ])
 
         query += """
         );
@@ -231,97 +388,91 @@ class OSMCollector:
 
     def _parse_overpass_result(
         self,
-        result: overpy.Result,
+        result: Dict[str, Any],
         poi_type: str
-    ) -> List[Dict[str, Any]]:
-        """Parse Overpass API result into POI data"""
+    ) -> Iterator[Dict[str, Any]]:
+        """Parse Overpass API result into POI data, one POI at a time"""
 
-        pois = []
-
-        for element in result.nodes + result.ways + result.relations:
+        # Raw element dicts; nodes carry lat/lon, ways and relations a center
+        for element in result.get('elements', ()):
             try:
                 # Get coordinates
-                if hasattr(element, 'lat'):
-                    lat, lon = element.lat, element.lon
-                elif hasattr(element, 'center_lat'):
-                    lat, lon = element.center_lat, element.center_lon
-                else:
+                point = element if 'lat' in element else element.get('center')
+                if not point:
                     continue  # Skip if no coordinates
+                tags = element.get('tags', {})
 
                 # Extract data
                 poi = {
-                    'name': element.tags.get('name', 'Unknown'),
-                    'name_local': element.tags.get('name:th') or element.tags.get('name:local'),
+                    'name': tags.get('name', 'Unknown'),
+                    'name_local': tags.get('name:th') or tags.get('name:local'),
                     'poi_type': poi_type,
-                    'coordinates': {'lat': float(lat), 'lng': float(lon)},
+                    'coordinates': {'lat': float(point['lat']), 'lng': float(point['lon'])},
 
                     # Practical info
-                    'opening_hours': element.tags.get('opening_hours'),
-                    'phone': element.tags.get('phone'),
-                    'website': element.tags.get('website'),
-                    'address': element.tags.get('addr:full') or self._build_address(element.tags),
+                    'opening_hours': tags.get('opening_hours'),
+                    'phone': tags.get('phone'),
+                    'website': tags.get('website'),
+                    'address': tags.get('addr:full') or self._build_address(tags),
 
                     # External IDs
-                    'osm_id': f"{element.id}",
-                    'osm_type': 'node' if hasattr(element, 'lat') else 'way',
-                    'wikidata_id': element.tags.get('wikidata'),
-                    'wikipedia_url': self._parse_wikipedia(element.tags.get('wikipedia')),
+                    'osm_id': f"{element['id']}",
+                    'osm_type': element['type'],
+                    'wikidata_id': tags.get('wikidata'),
+                    'wikipedia_url': _parse_wikipedia(tags.get('wikipedia')),
 
                     # Description from OSM
-                    'description': element.tags.get('description'),
+                    'description': tags.get('description'),
 
                     # All OSM tags for reference
                     'metadata': {
-                        'osm_tags': dict(element.tags)
+                        'osm_tags': tags
                     },
 
                     # Data source
                     'data_sources': ['osm']
                 }
 
-                pois.append(poi)
-
             except Exception as e:
                 logger.warning(f"Error parsing element: {e}")
                 continue
 
-        return pois
+            yield poi
 
     def _parse_destinations(
         self,
-        result: overpy.Result,
-        dest_type: str,
+        result: Dict[str, Any],
         country_code: str
     ) -> List[Dict[str, Any]]:
         """Parse destinations from Overpass result"""
 
         destinations = []
 
-        for element in result.nodes + result.ways:
+        for element in result.get('elements', ()):
+            if element.get('type') not in ('node', 'way'):
+                continue
             try:
-                if hasattr(element, 'lat'):
-                    lat, lon = element.lat, element.lon
-                elif hasattr(element, 'center_lat'):
-                    lat, lon = element.center_lat, element.center_lon
-                else:
+                point = element if 'lat' in element else element.get('center')
+                if not point:
                     continue
+                tags = element.get('tags', {})
 
                 dest = {
-                    'name': element.tags.get('name', 'Unknown'),
-                    'name_local': element.tags.get('name:th') or element.tags.get('name:local'),
-                    'destination_type': dest_type,
+                    'name': tags.get('name', 'Unknown'),
+                    'name_local': tags.get('name:th') or tags.get('name:local'),
+                    'destination_type': tags.get('place'),
                     'country': country_code,
 
-                    'coordinates': {'lat': float(lat), 'lng': float(lon)},
+                    'coordinates': {'lat': float(point['lat']), 'lng': float(point['lon'])},
 
-                    'population': element.tags.get('population'),
-                    'wikidata_id': element.tags.get('wikidata'),
-                    'wikipedia_url': self._parse_wikipedia(element.tags.get('wikipedia')),
+                    'population': tags.get('population'),
+                    'wikidata_id': tags.get('wikidata'),
+                    'wikipedia_url': _parse_wikipedia(tags.get('wikipedia')),
 
-                    'osm_id': f"{element.id}",
+                    'osm_id': f"{element['id']}",
 
                     'metadata': {
-                        'osm_tags': dict(element.tags)
+                        'osm_tags': tags
                     },
 
                     'data_sources': ['osm']
@@ -336,102 +487,19 @@ class OSMCollector:
         return destinations
 
     def _get_poi_tags(self, poi_type: str) -> List[str]:
-        """Get OSM tags for POI type"""
-
-        # Mapping of POI types to OSM tags
-        POI_TAGS = {
-            'temple': [
-                'amenity=place_of_worship', # Broadened for all religions
-                'building=temple',
-                'historic=temple',
-                'religion=buddhist',
-                'religion=hindu',
-                'religion=sikh',
-                'religion=muslim',
-                'religion=christian'
-            ],
-            'historic': [ # New category for landmarks
-                'historic=monument',
-                'historic=memorial',
-                'historic=fort',
-                'historic=castle',
-                'historic=ruins',
-                'tourism=attraction',
-                'historic=tomb'
-            ],
-            'beach': [
-                'natural=beach',
-                'natural=coastline'
-            ],
-            'market': [
-                'amenity=marketplace',
-                'amenity=market'
-            ],
-            'viewpoint': [
-                'tourism=viewpoint'
-            ],
-            'museum': [
-                'tourism=museum',
-                'amenity=arts_centre'
-            ],
-            'national_park': [
-                'boundary=national_park',
-                'leisure=nature_reserve'
-            ],
-            'waterfall': [
-                'waterway=waterfall',
-                'natural=waterfall'
-            ],
-            'palace': [
-                'historic=palace',
-                'historic=castle',
-                'building=palace'
-            ],
-            'island': [
-                'place=island'
-            ],
-            'restaurant': [
-                'amenity=restaurant'
-            ],
-            'hotel': [
-                'tourism=hotel',
-                'tourism=guest_house'
-            ]
-        }
-
-        return POI_TAGS.get(poi_type, [])
+        """Get Overpass tag filters for POI type"""
+        return POI_TAG_FILTERS.get(poi_type, [])
 
     def _build_address(self, tags: Dict[str, str]) -> Optional[str]:
         """Build address from OSM tags"""
-        parts = []
-
-        if 'addr:housenumber' in tags:
-            parts.append(tags['addr:housenumber'])
-        if 'addr:street' in tags:
-            parts.append(tags['addr:street'])
-        if 'addr:city' in tags:
-            parts.append(tags['addr:city'])
-        if 'addr:province' in tags:
-            parts.append(tags['addr:province'])
-
+        parts = [tags[key] for key in _ADDRESS_KEYS if key in tags]
         return ', '.join(parts) if parts else None
 
-    def _parse_wikipedia(self, wikipedia_tag: Optional[str]) -> Optional[str]:
-        """Parse Wikipedia tag to URL"""
-        if not wikipedia_tag:
-            return None
-
-        # Format: "en:Article Name" or "th:ชื่อบทความ"
-        if ':' in wikipedia_tag:
-            lang, article = wikipedia_tag.split(':', 1)
-            article = article.replace(' ', '_')
-            return f"https://{lang}.wikipedia.org/wiki/{article}"
-
-        return None
-
     def _rate_limit(self):
         """Ensure we don't exceed rate limits"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+        # Monotonic, so a wall clock adjustment can't stretch or skip the wait
+        with self._rate_lock:
+            wait = self._next_request_time - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request_time = time.monotonic() + self.rate_limit_delay
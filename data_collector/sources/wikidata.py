@@ -1,28 +1,158 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from SPARQLWrapper import SPARQLWrapper, JSON
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from utils.prompt_cache import PromptCache
 
 logger = logging.getLogger(__name__)
 
+# Cached city details are refetched after this long, so population etc. eventually catch up
+_CACHE_TTL_SECONDS = 30 * 86400
+
+# Accepted instance-of (P31) values: city, big city, capital, town. A fixed list
+# is much cheaper for the query service than walking the P279* subclass tree.
+_CITY_TYPES = "wd:Q515, wd:Q1549591, wd:Q5119, wd:Q3957"
+
+# Returned by _cached when a city has to be fetched; None is a cached "no match"
+_MISS = object()
+
 class WikidataCollector:
     """Collects city data from Wikidata using SPARQL."""
 
-    def __init__(self, user_agent: str = "BeyondEscapismBot/1.0 (contact@beyondescapism.com)"):
-        self.sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
-        self.sparql.setReturnFormat(JSON)
-        self.sparql.addCustomHttpHeader("User-Agent", user_agent)
+    def __init__(
+        self,
+        user_agent: str = "BeyondEscapismBot/1.0 (contact@beyondescapism.com)",
+        cache_path: Path = Path(".cache") / "wikidata.sqlite",
+        use_cache: bool = True
+    ):
+        self.user_agent = user_agent
+        self.sparql = self._make_sparql()
+        # A SPARQLWrapper holds its current query, so each thread gets its own
+        self._local = threading.local()
+        self._local.sparql = self.sparql
+        
+        # SPARQL results keyed by query text, so re-runs skip identical round trips
+        self.use_cache = use_cache
+        self._cache = PromptCache(cache_path, enabled=use_cache)
+        self._memo: Dict[str, Optional[Dict]] = {}
         
         # Bypass SSL verification (Fix for macOS Python)
         import ssl
         if hasattr(ssl, '_create_unverified_context'):
             ssl._create_default_https_context = ssl._create_unverified_context
 
+    def _make_sparql(self) -> SPARQLWrapper:
+        sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
+        sparql.setReturnFormat(JSON)
+        sparql.addCustomHttpHeader("User-Agent", self.user_agent)
+        return sparql
+
+    def _thread_sparql(self) -> SPARQLWrapper:
+        sparql = getattr(self._local, "sparql", None)
+        if sparql is None:
+            sparql = self._local.sparql = self._make_sparql()
+        return sparql
+
+    def get_city_details_many(self, city_names: List[str], concurrency: int = 5) -> Dict[str, Optional[Dict]]:
+        """
+        get_city_details for several cities, with up to `concurrency` SPARQL queries
+        in flight at once (Wikidata allows about five parallel queries per client).
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return dict(zip(city_names, executor.map(self.get_city_details, city_names)))
+
     def get_city_details(self, city_name: str) -> Optional[Dict]:
         """
         Fetches details for a city: Image, Population, Currency, Description, Coordinates.
         """
+        result = self._cached(city_name)
+        if result is not _MISS:
+            return result
+        
         logger.info(f"Fetching Wikidata for: {city_name}")
         
+        try:
+            sparql = self._thread_sparql()
+            sparql.setQuery(self._city_query(city_name))
+            bindings = sparql.query().convert()["results"]["bindings"]
+            if bindings:
+                result = self._parse_city(city_name, bindings[0])
+            else:
+                logger.warning(f"No Wikidata found for {city_name}")
+                result = None
+        except Exception as e:
+            # Failures are not cached, so the next run retries
+            logger.error(f"Wikidata query failed for {city_name}: {e}")
+            return None
+        
+        self._store(city_name, result)
+        return result
+    
+    def get_many(self, city_names: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        get_city_details for several cities in a single SPARQL request: the uncached
+        names go into one VALUES block and the rows are grouped back by label.
+        Cities Wikidata has no match for map to None, as do all of them if the request fails.
+        """
+        results = {name: self._cached(name) for name in city_names}
+        missing = [name for name, result in results.items() if result is _MISS]
+        if not missing:
+            return results
+        
+        logger.info(f"Fetching Wikidata for: {', '.join(missing)}")
+        
+        labels = " ".join(f'"{name}"@en' for name in missing)
+        query = f"""
+        SELECT ?lbl ?city ?countryLabel ?population ?image ?currencyLabel ?coords ?desc WHERE {{
+          VALUES ?lbl {{ {labels} }}
+          ?city rdfs:label ?lbl.
+          ?city wdt:P31 ?type.
+          FILTER(?type IN ({_CITY_TYPES}))
+          
+          OPTIONAL {{ ?city wdt:P17 ?country. }}
+          OPTIONAL {{ ?city wdt:P1082 ?population. }}
+          OPTIONAL {{ ?city wdt:P18 ?image. }}
+          OPTIONAL {{ ?city wdt:P38 ?currency. }}
+          OPTIONAL {{ ?city wdt:P625 ?coords. }}
+          OPTIONAL {{ ?city schema:description ?desc. FILTER(LANG(?desc) = "en") }}
+          
+          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+        }}
+        """
+        
+        try:
+            sparql = self._thread_sparql()
+            sparql.setQuery(query)
+            bindings = sparql.query().convert()["results"]["bindings"]
+        except Exception as e:
+            logger.error(f"Wikidata query failed for {', '.join(missing)}: {e}")
+            results.update((name, None) for name in missing)
+            return results
+        
+        # First row per city, as LIMIT 1 does for a single city
+        rows = {}
+        for row in bindings:
+            rows.setdefault(row["lbl"]["value"], row)
+        
+        for name in missing:
+            if name in rows:
+                try:
+                    results[name] = self._parse_city(name, rows[name])
+                except Exception as e:
+                    logger.error(f"Wikidata query failed for {name}: {e}")
+                    results[name] = None
+                    continue
+            else:
+                logger.warning(f"No Wikidata found for {name}")
+                results[name] = None
+            self._store(name, results[name])
+        return results
+    
+    def _city_query(self, city_name: str) -> str:
+        """SPARQL for a single city; its text is also the city's cache key"""
         # SPARQL Query
         # ?cityLabel: Name
         # ?countryLabel: Country
@@ -34,7 +164,8 @@ class WikidataCollector:
         query = f"""
         SELECT ?city ?cityLabel ?countryLabel ?population ?image ?currencyLabel ?coords ?desc WHERE {{
           ?city rdfs:label "{city_name}"@en.
-          ?city wdt:P31/wdt:P279* wd:Q515.  # Instance of city or subclass
+          ?city wdt:P31 ?type.
+          FILTER(?type IN ({_CITY_TYPES}))
           
           OPTIONAL {{ ?city wdt:P17 ?country. }}
           OPTIONAL {{ ?city wdt:P1082 ?population. }}
@@ -47,45 +178,52 @@ class WikidataCollector:
         }}
         LIMIT 1
         """
+        return query
+    
+    def _cache_key(self, city_name: str) -> bytes:
+        return PromptCache.make_key("wikidata", self._city_query(city_name))
+    
+    def _cached(self, city_name: str):
+        """Cached details for city_name (possibly None for "no match"), or _MISS"""
+        if city_name in self._memo:
+            return self._memo[city_name]
+        cached = self._cache.get(self._cache_key(city_name))
+        if cached is None or time.time() - cached["fetched_at"] >= _CACHE_TTL_SECONDS:
+            return _MISS
+        if self.use_cache:
+            self._memo[city_name] = cached["result"]
+        return cached["result"]
+    
+    def _store(self, city_name: str, result: Optional[Dict]):
+        self._cache.set(self._cache_key(city_name), {"fetched_at": time.time(), "result": result})
+        if self.use_cache:
+            self._memo[city_name] = result
+    
+    def _parse_city(self, city_name: str, data: Dict) -> Dict:
+        """City details from one SPARQL result row"""
+        # Extract and clean data
+        result = {
+            "name": city_name,
+            "country": data.get("countryLabel", {}).get("value"),
+            "population": int(data.get("population", {}).get("value", 0)),
+            "image": data.get("image", {}).get("value"),
+            "currency": data.get("currencyLabel", {}).get("value"),
+            "description": data.get("desc", {}).get("value"),
+            "wikidata_id": data.get("city", {}).get("value").split("/")[-1]
+        }
         
-        try:
-            self.sparql.setQuery(query)
-            results = self.sparql.query().convert()
-            
-            bindings = results["results"]["bindings"]
-            if not bindings:
-                logger.warning(f"No Wikidata found for {city_name}")
-                return None
-                
-            data = bindings[0]
-            
-            # Extract and clean data
-            result = {
-                "name": city_name,
-                "country": data.get("countryLabel", {}).get("value"),
-                "population": int(data.get("population", {}).get("value", 0)),
-                "image": data.get("image", {}).get("value"),
-                "currency": data.get("currencyLabel", {}).get("value"),
-                "description": data.get("desc", {}).get("value"),
-                "wikidata_id": data.get("city", {}).get("value").split("/")[-1]
-            }
-            
-            # Parse coordinates "Point(100.5 13.75)" -> {lat: 13.75, lng: 100.5}
-            if "coords" in data:
-                wkt = data["coords"]["value"]
-                # WKT format: Point(LNG LAT)
-                try:
-                    clean_wkt = wkt.replace("Point(", "").replace(")", "")
-                    lng, lat = map(float, clean_wkt.split())
-                    result["coordinates"] = {"lat": lat, "lng": lng}
-                except Exception as e:
-                    logger.warning(f"Failed to parse coords for {city_name}: {e}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Wikidata query failed for {city_name}: {e}")
-            return None
+        # Parse coordinates "Point(100.5 13.75)" -> {lat: 13.75, lng: 100.5}
+        if "coords" in data:
+            wkt = data["coords"]["value"]
+            # WKT format: Point(LNG LAT)
+            try:
+                clean_wkt = wkt.replace("Point(", "").replace(")", "")
+                lng, lat = map(float, clean_wkt.split())
+                result["coordinates"] = {"lat": lat, "lng": lng}
+            except Exception as e:
+                logger.warning(f"Failed to parse coords for {city_name}: {e}")
+        
+        return result
 
 if __name__ == "__main__":
     # Test run
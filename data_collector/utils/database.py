@@ -3,19 +3,64 @@ Database utilities for data collector
 Handles all Supabase interactions
 """
 
+import atexit
 import os
+import queue
+import threading
+import time
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Rows per POI write request; keeps each request body well under PostgREST's size limits
+POI_BATCH_SIZE = int(os.getenv("POI_BATCH_SIZE", "500"))
+
+# osm_ids per existence lookup. They travel in the query string ("way/1234567890" is ~18 URL
+# characters with its separator), so this keeps the URL around 4KB, clear of the ~8KB limit
+_OSM_ID_LOOKUP_BATCH_SIZE = 200
+
+# POI upsert requests save_pois keeps in flight at once
+POI_UPSERT_CONCURRENCY = int(os.getenv("POI_UPSERT_CONCURRENCY", "8"))
+
+# log_message entries per data_collection_log insert, and the longest an entry waits for its batch
+_LOG_BATCH_SIZE = 200
+_LOG_FLUSH_SECONDS = 2.0
+
+# Destinations queue_destinations collects before inserting them in one request
+_DESTINATION_BATCH_SIZE = 200
+
+# Queued by flush_logs to close the current log batch without waiting out _LOG_FLUSH_SECONDS
+_FLUSH = object()
+
+class _OrjsonClient(httpx.Client):
+    """httpx client that encodes JSON request bodies with orjson"""
+    
+    def build_request(self, method, url, *, json=None, content=None, headers=None, **kwargs):
+        if json is not None and content is None:
+            content = orjson.dumps(json)
+            headers = httpx.Headers(headers)
+            headers['Content-Type'] = 'application/json'
+            json = None
+        return super().build_request(method, url, content=content, json=json, headers=headers, **kwargs)
+
 class Database:
     """Database interface for data collection"""
     
+    # Shared by every instance, so save_pois doesn't start threads on each call
+    _upsert_pool = ThreadPoolExecutor(max_workers=POI_UPSERT_CONCURRENCY, thread_name_prefix="poi-upsert")
+    
     def __init__(self, schema: str = None):
         """Initialize Supabase client"""
         self.url = os.getenv("SUPABASE_URL")
@@ -32,13 +77,66 @@ class Database:
         
         options = ClientOptions(schema=self.schema)
         self.client: Client = create_client(self.url, self.key, options=options)
+        self._pool_postgrest_session()
+        
+        # Countries and provinces found so far; they change rarely, so each is fetched once.
+        # Misses aren't kept, so a province created after a failed lookup is still found.
+        self._countries: Dict[str, Dict] = {}
+        self._provinces: Dict[Tuple[str, str], Dict] = {}
+        
+        # log_message only queues; a background thread inserts the entries in batches.
+        # The thread and its exit hook are set up by the first log_message, so instances
+        # that never log cost nothing.
+        self._log_queue = queue.Queue()
+        self._log_flusher_started = False
+        self._log_flusher_lock = threading.Lock()
+        
+        # queue_destinations only buffers; full batches (and whatever is left at exit) are inserted together
+        self._destination_buffer: List[Dict] = []
+        self._destination_lock = threading.Lock()
+        self._destination_flush_registered = False
         
         logger.info(f"Connected to Supabase (Schema: {self.schema})")
     
+    def _pool_postgrest_session(self):
+        """
+        Reuse keep-alive (and HTTP/2 when h2 is installed) connections for PostgREST calls,
+        retrying failed connection attempts and encoding request bodies with orjson when it is available
+        """
+        try:
+            try:
+                import h2  # noqa: F401 - required by httpx for http2=True
+                http2 = True
+            except ImportError:
+                http2 = False
+            
+            postgrest = self.client.postgrest
+            session = postgrest.session
+            client_cls = _OrjsonClient if orjson else httpx.Client
+            # The transport owns pooling, so http2 and limits are set on it rather than the client.
+            # retries only covers connecting, so a request is never sent twice.
+            postgrest.session = client_cls(
+                base_url=session.base_url,
+                headers=session.headers,
+                timeout=session.timeout,
+                transport=httpx.HTTPTransport(
+                    http2=http2,
+                    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=60),
+                    retries=2,
+                ),
+            )
+            session.close()
+        except Exception as e:
+            logger.warning(f"Could not configure pooled PostgREST session: {e}")
+    
     def get_country(self, country_code: str) -> Optional[Dict]:
         """Get country by code"""
+        if country_code in self._countries:
+            return self._countries[country_code]
         try:
             result = self.client.table('countries').select('*').eq('code', country_code).single().execute()
+            if result.data:
+                self._countries[country_code] = result.data
             return result.data
         except Exception as e:
             logger.error(f"Error getting country {country_code}: {e}")
@@ -67,52 +165,99 @@ class Database:
             return False
     
     def log_message(self, job_id: str, level: str, message: str, data: Dict = None) -> None:
-        """Log a message to data_collection_log"""
-        try:
-            log_entry = {
-                'job_id': job_id,
-                'level': level,
-                'message': message,
-                'data': data or {}
-            }
-            self.client.table('data_collection_log').insert(log_entry).execute()
-        except Exception as e:
-            logger.warning(f"Error logging message: {e}")
+        """Log a message to data_collection_log (written in the background; see flush_logs)"""
+        log_entry = {
+            'job_id': job_id,
+            'level': level,
+            'message': message,
+            'data': data or {}
+        }
+        if not self._log_flusher_started:
+            self._start_log_flusher()
+        self._log_queue.put(log_entry)
+    
+    def _start_log_flusher(self):
+        with self._log_flusher_lock:
+            if not self._log_flusher_started:
+                threading.Thread(target=self._log_flusher, name="db-log-flusher", daemon=True).start()
+                atexit.register(self.flush_logs)
+                self._log_flusher_started = True
+    
+    def flush_logs(self) -> None:
+        """Block until every message passed to log_message so far has been written (runs at exit too)"""
+        if not self._log_flusher_started:
+            return
+        self._log_queue.put(_FLUSH)
+        self._log_queue.join()
+    
+    def _log_flusher(self):
+        """Inserts queued log entries, up to _LOG_BATCH_SIZE per request"""
+        while True:
+            items = [self._log_queue.get()]
+            deadline = time.monotonic() + _LOG_FLUSH_SECONDS
+            while len(items) < _LOG_BATCH_SIZE and items[-1] is not _FLUSH:
+                try:
+                    items.append(self._log_queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            entries = [item for item in items if item is not _FLUSH]
+            if entries:
+                try:
+                    self.client.table('data_collection_log').insert(entries).execute()
+                except Exception as e:
+                    logger.warning(f"Error logging {len(entries)} messages: {e}")
+            for _ in items:
+                self._log_queue.task_done()
     
     def save_pois(self, pois: List[Dict]) -> int:
         """Save POIs to database with robust deduplication"""
         if not pois:
             return 0
         
-        try:
-            # Try upsert first (most efficient if constraint exists)
-            result = self.client.table('pois').upsert(pois, on_conflict='osm_id').execute()
-            count = len(result.data) if result.data else 0
-            logger.info(f"Saved {count} POIs to database (upsert)")
-            return count
-        except Exception as e:
-            error_msg = str(e)
-            # Check for "no unique constraint" error (Postgres 42P10)
-            if '42P10' in error_msg or 'there is no unique or exclusion constraint' in error_msg:
-                logger.warning("Unique constraint missing on osm_id. Falling back to check-then-insert.")
-                return self._save_pois_manual_dedup(pois)
-            else:
-                logger.error(f"Error saving POIs: {e}")
-                return 0
+        # Try upsert first (most efficient if constraint exists), in POI_BATCH_SIZE chunks
+        # with several requests in flight at once
+        chunks = [pois[start:start + POI_BATCH_SIZE] for start in range(0, len(pois), POI_BATCH_SIZE)]
+        futures = [self._upsert_pool.submit(self._upsert_pois, chunk) for chunk in chunks]
+        
+        count = 0
+        no_constraint = []
+        for chunk, future in zip(chunks, futures):
+            try:
+                count += future.result()
+            except Exception as e:
+                error_msg = str(e)
+                # Check for "no unique constraint" error (Postgres 42P10)
+                if '42P10' in error_msg or 'there is no unique or exclusion constraint' in error_msg:
+                    no_constraint.extend(chunk)
+                else:
+                    logger.error(f"Error saving POIs: {e}")
+        logger.info(f"Saved {count} POIs to database (upsert)")
+        
+        if no_constraint:
+            logger.warning("Unique constraint missing on osm_id (see migrations/007_pois_osm_id_unique.sql). Falling back to check-then-insert.")
+            count += self._save_pois_manual_dedup(no_constraint)
+        return count
+    
+    def _upsert_pois(self, pois: List[Dict]) -> int:
+        """Upsert one chunk of POIs on osm_id, returning the number of rows written"""
+        result = self.client.table('pois').upsert(pois, on_conflict='osm_id').execute()
+        return len(result.data) if result.data else 0
 
     def _save_pois_manual_dedup(self, pois: List[Dict]) -> int:
         """Manually deduplicate POIs against database"""
         try:
             # Extract OSM IDs from input
-            osm_ids = [p.get('osm_id') for p in pois if p.get('osm_id')]
+            osm_ids = list(dict.fromkeys(p.get('osm_id') for p in pois if p.get('osm_id')))
             if not osm_ids:
                 return 0
                 
-            # Query existing IDs
-            # Note: Supabase limit is usually 1000, so we might need batching if list is huge
-            # But for now we assume batch size < 1000
-            existing_result = self.client.table('pois').select('osm_id').in_('osm_id', osm_ids).execute()
-            existing_ids = {item['osm_id'] for item in existing_result.data}
+            # Query existing IDs in URL-sized batches; an over-long URL fails the whole lookup
+            existing_ids = set()
+            for start in range(0, len(osm_ids), _OSM_ID_LOOKUP_BATCH_SIZE):
+                batch = osm_ids[start:start + _OSM_ID_LOOKUP_BATCH_SIZE]
+                existing_result = self.client.table('pois').select('osm_id').in_('osm_id', batch).execute()
+                existing_ids.update(item['osm_id'] for item in existing_result.data)
             
             # Filter out existing
             new_pois = [p for p in pois if p.get('osm_id') not in existing_ids]
@@ -122,8 +267,10 @@ class Database:
                 return 0
                 
             # Insert new records
-            result = self.client.table('pois').insert(new_pois).execute()
-            count = len(result.data) if result.data else 0
+            count = 0
+            for start in range(0, len(new_pois), POI_BATCH_SIZE):
+                result = self.client.table('pois').insert(new_pois[start:start + POI_BATCH_SIZE]).execute()
+                count += len(result.data) if result.data else 0
             logger.info(f"Saved {count} new POIs to database (manual dedup)")
             return count
             
@@ -145,12 +292,51 @@ class Database:
             logger.error(f"Error saving destinations: {e}")
             return 0
     
+    def queue_destinations(self, destinations: List[Dict]) -> int:
+        """
+        Batched save_destinations for callers saving a few at a time: rows are inserted once
+        _DESTINATION_BATCH_SIZE have built up, or by flush_destinations (which also runs at exit).
+        Returns the number of rows this call wrote.
+        """
+        if not destinations:
+            return 0
+        
+        with self._destination_lock:
+            if not self._destination_flush_registered:
+                atexit.register(self.flush_destinations)
+                self._destination_flush_registered = True
+            self._destination_buffer.extend(destinations)
+            if len(self._destination_buffer) < _DESTINATION_BATCH_SIZE:
+                return 0
+        return self.flush_destinations()
+    
+    def flush_destinations(self) -> int:
+        """Insert every queued destination, returning the number of rows written (runs at exit too)"""
+        with self._destination_lock:
+            pending, self._destination_buffer = self._destination_buffer, []
+        
+        count = 0
+        for start in range(0, len(pending), _DESTINATION_BATCH_SIZE):
+            try:
+                result = self.client.table('destinations').insert(pending[start:start + _DESTINATION_BATCH_SIZE]).execute()
+                count += len(result.data) if result.data else 0
+            except Exception as e:
+                logger.error(f"Error saving destinations: {e}")
+        
+        if count:
+            logger.info(f"Saved {count} destinations to database")
+        return count
+    
     def get_province(self, country_code: str, province_name: str) -> Optional[Dict]:
         """Get province by name"""
+        if (country_code, province_name) in self._provinces:
+            return self._provinces[(country_code, province_name)]
         try:
             result = self.client.table('provinces').select('*').eq(
                 'country_code', country_code
             ).eq('name', province_name).single().execute()
+            if result.data:
+                self._provinces[(country_code, province_name)] = result.data
             return result.data
         except Exception as e:
             logger.debug(f"Province {province_name} not found: {e}")
@@ -168,5 +354,20 @@ class Database:
             return None
 
 
-# Global database instance
-db = Database()
+_databases: Dict[Optional[str], Database] = {}
+_databases_lock = threading.Lock()
+
+def get_database(schema: str = None) -> Database:
+    """Shared Database per schema, so loaders in one process reuse a single client"""
+    # Locked so threads starting at once don't each connect
+    with _databases_lock:
+        if schema not in _databases:
+            _databases[schema] = Database(schema=schema)
+        return _databases[schema]
+
+
+def __getattr__(name: str):
+    # Global database instance, connected on first use rather than at import
+    if name == "db":
+        return get_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,20 @@ Automatically identifies important tourism cities for any country.
 """
 
 import requests
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict
 import json
+from utils.prompt_cache import PromptCache
+
+# Cached Overpass responses are refetched after this long
+_CACHE_TTL_SECONDS = 7 * 86400
+
+# Default bbox: ~20km radius
+_BBOX_OFFSET = 0.2  # degrees (~20km)
 
 class TourismDestinationDiscovery:
     """
@@ -13,8 +25,24 @@ class TourismDestinationDiscovery:
     Uses multiple data sources to identify cities worth collecting data for.
     """
     
-    def __init__(self):
+    def __init__(self, cache_path: Path = Path(".cache") / "overpass.sqlite", use_cache: bool = True):
         self.overpass_url = "https://overpass-api.de/api/interpreter"
+        # One keep-alive session for every query. Overpass queries are read-only, so retrying
+        # a POST on overload (429/502/503/504) is safe; Retry-After is honoured.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=frozenset(["POST"]),
+                raise_on_status=False
+            )
+        ))
+        # Overpass responses keyed by query text, so re-running a country skips the slow fetches
+        self._cache = PromptCache(cache_path, enabled=use_cache)
         
     def discover_destinations(self, country: str, min_population: int = 50000) -> List[Dict]:
         """
@@ -29,14 +57,20 @@ class TourismDestinationDiscovery:
         """
         print(f"🔍 Discovering tourism destinations in {country}...")
         
-        # Step 1: Get major cities from Overpass
-        cities = self._get_major_cities(country, min_population)
-        
-        # Step 2: Get UNESCO sites
-        unesco_sites = self._get_unesco_sites(country)
-        
-        # Step 3: Get popular tourist destinations from Wikidata
-        tourist_destinations = self._get_tourist_destinations(country)
+        # Steps 1-3 are independent requests, so they run side by side
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Step 1: Get major cities from Overpass
+            cities_future = executor.submit(self._get_major_cities, country, min_population)
+            
+            # Step 2: Get UNESCO sites
+            unesco_future = executor.submit(self._get_unesco_sites, country)
+            
+            # Step 3: Get popular tourist destinations from Wikidata
+            tourist_future = executor.submit(self._get_tourist_destinations, country)
+            
+            cities = cities_future.result()
+            unesco_sites = unesco_future.result()
+            tourist_destinations = tourist_future.result()
         
         # Step 4: Merge and deduplicate
         all_destinations = self._merge_destinations(cities, unesco_sites, tourist_destinations)
@@ -59,8 +93,7 @@ class TourismDestinationDiscovery:
         """
         
         try:
-            response = requests.post(self.overpass_url, data={"data": query}, timeout=60)
-            data = response.json()
+            data = self._query_overpass(query)
             
             cities = []
             for element in data.get('elements', []):
@@ -94,8 +127,7 @@ class TourismDestinationDiscovery:
         """
         
         try:
-            response = requests.post(self.overpass_url, data={"data": query}, timeout=60)
-            data = response.json()
+            data = self._query_overpass(query)
             
             sites = []
             for element in data.get('elements', []):
@@ -121,6 +153,22 @@ class TourismDestinationDiscovery:
             print(f"⚠️ Error fetching UNESCO sites: {e}")
             return []
             
+    def _query_overpass(self, query: str) -> Dict:
+        """Overpass response for query, from the cache when fetched within the last week"""
+        cache_key = PromptCache.make_key("overpass", query)
+        cached = self._cache.get(cache_key)
+        if cached is not None and time.time() - cached["fetched_at"] < _CACHE_TTL_SECONDS:
+            return cached["data"]
+        
+        response = self._session.post(self.overpass_url, data={"data": query}, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Timed-out queries come back as a 200 with partial data; don't keep those
+        if not data.get("remark", "").startswith("runtime error"):
+            self._cache.set(cache_key, {"fetched_at": time.time(), "data": data})
+        return data
+        
     def _get_tourist_destinations(self, country: str) -> List[Dict]:
         """Get popular tourist destinations from Wikidata"""
         # Simplified version - in production, use Wikidata SPARQL
@@ -128,16 +176,41 @@ class TourismDestinationDiscovery:
         return []
         
     def _merge_destinations(self, *destination_lists) -> List[Dict]:
-        """Merge and deduplicate destinations"""
+        """
+        Merge and deduplicate destinations by name. A UNESCO site inside a city's ~11km
+        grid cell is listed on that city (as 'unesco_sites') rather than on its own,
+        since the city's bbox already covers it.
+        """
         all_dests = []
+        by_name = {}
         seen_names = set()
+        # (lat, lon) rounded to 0.1 degrees -> first city in that cell
+        city_cells = {}
         
         for dest_list in destination_lists:
             for dest in dest_list:
                 name = dest['name']
-                if name and name not in seen_names:
-                    seen_names.add(name)
-                    all_dests.append(dest)
+                if not name:
+                    continue
+                key = name.lower().strip()
+                
+                if key in seen_names:
+                    # The same place from another source; a UNESCO listing marks the city, keeping its row
+                    existing = by_name.get(key)
+                    if existing is not None and dest.get('type') == 'unesco':
+                        existing['type'] = 'unesco'
+                    continue
+                seen_names.add(key)
+                
+                cell = (round(dest['lat'] * 10), round(dest['lon'] * 10))
+                if dest.get('type') == 'unesco' and cell in city_cells:
+                    city_cells[cell].setdefault('unesco_sites', []).append(name)
+                    continue
+                
+                by_name[key] = dest
+                if dest.get('type') == 'city':
+                    city_cells.setdefault(cell, dest)
+                all_dests.append(dest)
         
         return all_dests
         
@@ -145,32 +218,29 @@ class TourismDestinationDiscovery:
         """Calculate bounding boxes for each destination"""
         for dest in destinations:
             lat, lon = dest['lat'], dest['lon']
-            
-            # Default bbox: ~20km radius
-            offset = 0.2  # degrees (~20km)
-            
             dest['bbox'] = {
-                'north': lat + offset,
-                'south': lat - offset,
-                'east': lon + offset,
-                'west': lon - offset
+                'north': lat + _BBOX_OFFSET,
+                'south': lat - _BBOX_OFFSET,
+                'east': lon + _BBOX_OFFSET,
+                'west': lon - _BBOX_OFFSET
             }
             
         return destinations
         
     def save_to_config(self, destinations: List[Dict], country: str, output_file: str = "discovered_cities.py"):
         """Save discovered destinations to a Python config file"""
-        config_code = f'''"""
+        # Collected as parts and joined once; += on one string recopies it per destination
+        parts = [f'''"""
 Auto-discovered tourism destinations for {country}
 Generated by TourismDestinationDiscovery
 """
 
 DISCOVERED_CITIES = {{
-'''
+''']
         
         for dest in destinations:
             city_key = dest['name'].lower().replace(' ', '_').replace('-', '_')
-            config_code += f'''    "{city_key}": {{
+            parts.append(f'''    "{city_key}": {{
         "name": "{dest['name']}",
         "country": "{country}",
         "bbox": {{
@@ -182,12 +252,12 @@ DISCOVERED_CITIES = {{
         "coordinates": {{"lat": {dest['lat']}, "lng": {dest['lon']}}},
         "type": "{dest.get('type', 'city')}"
     }},
-'''
+''')
         
-        config_code += "}\n"
+        parts.append("}\n")
         
         with open(output_file, 'w') as f:
-            f.write(config_code)
+            f.write("".join(parts))
             
         print(f"✅ Saved {len(destinations)} destinations to {output_file}")
 
@@ -0,0 +1,67 @@
+"""
+JSON helpers for pipeline data files
+Uses orjson when it is installed and falls back to the stdlib json module
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _open(path: Union[str, Path], mode: str):
+    """open(), or gzip.open() for .gz paths"""
+    if str(path).endswith('.gz'):
+        # Level 3 is several times faster than gzip's default 9 for nearly the same size
+        return gzip.open(path, mode, compresslevel=3)
+    return open(path, mode)
+
+def read_jsonl(path: Union[str, Path]) -> Iterator[Any]:
+    """Yield one parsed object per non-empty line of a JSON Lines file (gzipped if it ends in .gz)"""
+    with _open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+def write_jsonl(path: Union[str, Path], objs: Iterable[Any]) -> int:
+    """
+    Write one compact JSON object per line (gzipped if path ends in .gz)
+    Returns the number of objects written
+    """
+    count = 0
+    with _open(path, 'wb') as f:
+        for obj in objs:
+            f.write(dumpb(obj) + b"\n")
+            count += 1
+    return count
+
+def dumpb(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode()
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string, keeping non-ASCII characters as-is"""
+    return dumpb(obj, indent).decode()
+
+def write_json(path: Union[str, Path], obj: Any, pretty: bool = False):
+    """
+    Write obj to path in a single call
+    Compact by default; pretty=True is for files people read by hand
+    """
+    Path(path).write_bytes(dumpb(obj, indent=pretty))
@@ -6,9 +6,39 @@ Uses Ollama for local LLM inference (FREE!)
 import json
 import re
 import os
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
+from utils.prompt_cache import PromptCache
+
+# Lead-ins the model sometimes puts before a generated description
+_DESCRIPTION_PREFIX_RE = re.compile(r'^(Here\'s|This is|The description is)[:\s]+', re.IGNORECASE)
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Street furniture and utilities (OSM amenity values) that no persona is drawn to. Without a
+# description there's nothing for the model to go on, so these get default scores unprompted.
+_LOW_VALUE_POI_TYPES = frozenset({
+    'bench', 'waste_basket', 'waste_disposal', 'recycling', 'streetlamp', 'street_lamp',
+    'post_box', 'telephone', 'vending_machine', 'parking', 'parking_space', 'parking_entrance',
+    'bicycle_parking', 'motorcycle_parking', 'charging_station', 'fuel', 'atm', 'toilets',
+    'drinking_water', 'shelter', 'grit_bin', 'hydrant', 'clock', 'letter_box', 'loading_dock'
+})
+
+
+def _is_low_value(poi_data: Dict[str, Any]) -> bool:
+    """Whether the POI is a _LOW_VALUE_POI_TYPES type with no description"""
+    return poi_data.get('poi_type') in _LOW_VALUE_POI_TYPES and not poi_data.get('description')
+
+
+def _format_personas(personas: List[Dict[str, Any]]) -> str:
+    """One "- id: keywords" line per persona, as the scoring prompts list them"""
+    return "\n".join([
+        f"- {p['id']}: {', '.join(p.get('keywords', []))}"
+        for p in personas
+    ])
 
 
 class LocalLLM:
@@ -21,7 +51,10 @@ class LocalLLM:
         self,
         model: str = None,
         temperature: float = 0.0,
-        base_url: str = None
+        base_url: str = None,
+        score_model: str = None,
+        cache_path: Path = Path(".cache") / "llm.sqlite",
+        use_cache: bool = True
     ):
         """
         Initialize local LLM
@@ -32,21 +65,69 @@ class LocalLLM:
             temperature: 0 = deterministic, 1 = creative
             base_url: Ollama server URL
                       If None, uses OLLAMA_BASE_URL env var or defaults to http://localhost:11434
+            score_model: Smaller model for persona scoring and tagging, which only fill in JSON
+                         If None, uses OLLAMA_SCORE_MODEL env var or defaults to llama3.2:3b-instruct-q4_K_M
+            cache_path: SQLite file for cached responses
+            use_cache: Set to False to always ask the model
         """
         # Use environment variables if parameters not provided
         self.model = model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+        self.score_model = score_model or os.getenv("OLLAMA_SCORE_MODEL", "llama3.2:3b-instruct-q4_K_M")
         ollama_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+        self.temperature = temperature
+
         self.llm = ChatOllama(
             model=self.model,
             temperature=temperature,
             base_url=ollama_url,
         )
+        # Same model constrained to emit a JSON object, for the prompts that ask for one
+        self.json_llm = ChatOllama(
+            model=self.model,
+            temperature=temperature,
+            base_url=ollama_url,
+            format="json",
+        )
+        # A 3B q4 model is plenty for picking scores and tags and runs about twice as fast;
+        # descriptions and destination content stay on the main model
+        self.score_llm = ChatOllama(
+            model=self.score_model,
+            temperature=temperature,
+            base_url=ollama_url,
+            format="json",
+        )
+
+        # Parsed responses keyed by (model, temperature, prompt), so re-runs skip identical generations
+        self._cache = PromptCache(cache_path, enabled=use_cache)
+
+    def _cached_invoke(
+        self,
+        prompt: str,
+        parse: Callable[[str], Any],
+        scoring: bool = False
+    ) -> Any:
+        """
+        parse(response text) for prompt, from the cache when this prompt was answered before.
+        Only responses that parse are cached, so a malformed reply is retried next time.
+        scoring sends the prompt through score_llm instead of the main model.
+        """
+        model = self.score_model if scoring else self.model
+        key = PromptCache.make_key(f"{model}@{self.temperature}", prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        llm = self.score_llm if scoring else self.llm
+        result = parse(llm.invoke([HumanMessage(content=prompt)]).content)
+        self._cache.set(key, result)
+        return result
 
     def score_poi_for_personas(
         self,
         poi_data: Dict[str, Any],
-        personas: List[Dict[str, Any]]
+        personas: List[Dict[str, Any]],
+        persona_descriptions: Optional[str] = None
     ) -> Dict[str, int]:
         """
         Score a POI for each travel persona (0-100)
@@ -54,14 +135,16 @@ class LocalLLM:
         Args:
             poi_data: POI information
             personas: List of persona definitions
+            persona_descriptions: _format_personas(personas), if the caller already has it
 
         Returns:
             Dict of persona scores {persona_id: score}
         """
-        persona_descriptions = "\n".join([
-            f"- {p['id']}: {', '.join(p.get('keywords', []))}"
-            for p in personas
-        ])
+        if _is_low_value(poi_data):
+            return {p['id']: 50 for p in personas}
+
+        if persona_descriptions is None:
+            persona_descriptions = _format_personas(personas)
 
         prompt = f"""You are a travel data analyst. Score this point of interest for each travel persona.
 
@@ -92,16 +175,8 @@ Return ONLY a valid JSON object with scores:
 """
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            scores = self._extract_json(response.content)
-
-            # Validate scores
-            validated_scores = {}
-            for persona in personas:
-                score = scores.get(persona['id'], 50)  # Default to 50
-                validated_scores[persona['id']] = max(0, min(100, int(score)))
-
-            return validated_scores
+            scores = self._cached_invoke(prompt, self._extract_json, scoring=True)
+            return self._validate_scores(scores, personas)
 
         except Exception as e:
             print(f"Error scoring POI: {e}")
@@ -149,11 +224,10 @@ Guidelines:
 Write only the description, no introductory text:"""
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            description = response.content.strip()
+            description = self._cached_invoke(prompt, str.strip)
 
             # Remove common prefixes
-            description = re.sub(r'^(Here\'s|This is|The description is)[:\s]+', '', description, flags=re.IGNORECASE)
+            description = _DESCRIPTION_PREFIX_RE.sub('', description)
 
             return description
 
@@ -201,8 +275,7 @@ Return ONLY a valid JSON object:
 """
 
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            tags = self._extract_json(response.content)
+            tags = self._cached_invoke(prompt, self._extract_json, scoring=True)
 
             return {
                 'vibe_tags': tags.get('vibe_tags', [])[:5],
@@ -217,7 +290,8 @@ Return ONLY a valid JSON object:
         self,
         pois: List[Dict[str, Any]],
         personas: List[Dict[str, Any]],
-        batch_size: int = 10
+        batch_size: int = 10,
+        max_workers: int = 4
     ) -> List[Dict[str, Any]]:
         """
         Score multiple POIs in batches for efficiency
@@ -226,23 +300,109 @@ Return ONLY a valid JSON object:
             pois: List of POI data
             personas: Persona definitions
             batch_size: Number of POIs to process at once
+            max_workers: Batches sent to Ollama at the same time
+                         (the server runs up to OLLAMA_NUM_PARALLEL of them in parallel)
 
         Returns:
             List of POIs with added persona_scores
         """
-        enriched_pois = []
+        # Low-value POIs get their default scores up front, so batches only carry POIs worth a prompt
+        llm_pois = []
+        for poi in pois:
+            if _is_low_value(poi):
+                poi['persona_scores'] = {p['id']: 50 for p in personas}
+            else:
+                llm_pois.append(poi)
+        scored_count = len(pois) - len(llm_pois)
+
+        batches = [llm_pois[i:i + batch_size] for i in range(0, len(llm_pois), batch_size)]
+        # The persona block is the same in every prompt, so it's formatted once
+        persona_descriptions = _format_personas(personas)
+
+        def score(batch: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+            # One prompt for the whole batch; POI by POI if the reply doesn't line up
+            batch_scores = self._score_batch(batch, personas, persona_descriptions)
+            if batch_scores is None:
+                batch_scores = [
+                    self.score_poi_for_personas(poi, personas, persona_descriptions)
+                    for poi in batch
+                ]
+            return batch_scores
+
+        # Batches are independent, so several are in flight at once; map keeps them in order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch, batch_scores in zip(batches, executor.map(score, batches)):
+                for poi, scores in zip(batch, batch_scores):
+                    poi['persona_scores'] = scores
+                scored_count += len(batch)
+
+                print(f"Scored {scored_count}/{len(pois)} POIs")
+
+        return pois
+
+    def _score_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        personas: List[Dict[str, Any]],
+        persona_descriptions: Optional[str] = None
+    ) -> Optional[List[Dict[str, int]]]:
+        """
+        Score several POIs with a single prompt
+
+        Returns:
+            One validated score dict per POI, in order, or None if the reply was unusable
+        """
+        if persona_descriptions is None:
+            persona_descriptions = _format_personas(personas)
+        poi_lines = "\n".join([
+            f"{n}. Name: {poi.get('name', 'Unknown')} | Type: {poi.get('poi_type', 'Unknown')} | "
+            f"Description: {poi.get('description', 'No description')}"
+            for n, poi in enumerate(batch, 1)
+        ])
+
+        prompt = f"""You are a travel data analyst. Score each point of interest below for each travel persona.
+
+Points of Interest:
+{poi_lines}
+
+Travel Personas:
+{persona_descriptions}
+
+Score each persona from 0-100 based on how well the POI matches their interests.
+- 90-100: Perfect match, must-visit for this persona
+- 70-89: Great match, highly recommended
+- 50-69: Good match, worth considering
+- 30-49: Moderate match, might interest some
+- 0-29: Poor match, unlikely to interest
+
+Return ONLY a valid JSON object whose "scores" list has exactly {len(batch)} entries, where the i-th entry holds the scores for the i-th POI:
+{{
+  "scores": [
+    {{"cultural_explorer": 85, "adventure_seeker": 40, "luxury_connoisseur": 50, "culinary_wanderer": 30, "wellness_retreater": 70, "social_nomad": 45}}
+  ]
+}}
+"""
 
-        for i in range(0, len(pois), batch_size):
-            batch = pois[i:i + batch_size]
+        def parse(text: str) -> List[Dict[str, int]]:
+            scores = self._extract_json(text).get('scores')
+            if not isinstance(scores, list) or len(scores) != len(batch) or not all(isinstance(s, dict) for s in scores):
+                raise ValueError(f"Expected {len(batch)} score objects, got: {text}")
+            return [self._validate_scores(s, personas) for s in scores]
 
-            for poi in batch:
-                scores = self.score_poi_for_personas(poi, personas)
-                poi['persona_scores'] = scores
-                enriched_pois.append(poi)
+        try:
+            return self._cached_invoke(prompt, parse, scoring=True)
+        except Exception as e:
+            print(f"Error batch scoring POIs, scoring one by one: {e}")
+            return None
 
-            print(f"Scored {min(i + batch_size, len(pois))}/{len(pois)} POIs")
+    def _validate_scores(self, scores: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Clamp scores to 0-100, defaulting missing personas to 50"""
+        validated_scores = {}
+        for persona in personas:
+            score = scores.get(persona['id'], 50)  # Default to 50
+            validated_scores[persona['id']] = max(0, min(100, int(score)))
 
-        return enriched_pois
+        return validated_scores
 
     def generate_destination_content(self, city: str, country: str) -> Dict:
         """Generate rich content for a destination."""
@@ -266,7 +426,7 @@ Return ONLY a valid JSON object:
         JSON:
         """
         try:
-            response = self.llm.invoke(prompt)
+            response = self.json_llm.invoke(prompt)
             # Handle LangChain AIMessage object
             content = response.content if hasattr(response, 'content') else str(response)
             
@@ -279,23 +439,25 @@ Return ONLY a valid JSON object:
 
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """Extract JSON from LLM response"""
-        # Find JSON block in response
-        json_match = re.search(r'\{[^}]+\}', text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
-
-        # Try to extract from code block
-        code_match = re.search(r'```(?:json)?\s*(\{.+?\})\s*```', text, re.DOTALL)
-        if code_match:
-            json_str = code_match.group(1)
+        # JSON mode replies are the bare object
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+
+        # Otherwise take the first complete object in the text (prose or a code block around it).
+        # raw_decode follows nesting, which a brace-matching regex can't.
+        start = text.find('{')
+        while start != -1:
             try:
-                return json.loads(json_str)
+                data, _ = _JSON_DECODER.raw_decode(text, start)
+                if isinstance(data, dict):
+                    return data
             except json.JSONDecodeError:
                 pass
+            start = text.find('{', start + 1)
 
         raise ValueError(f"Could not extract valid JSON from response: {text}")
 
@@ -0,0 +1,60 @@
+"""
+Persistent cache for LLM responses and other slow, deterministic lookups
+Keyed by (model, prompt) so re-runs skip identical generations
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("PromptCache")
+
+class PromptCache:
+    """
+    SQLite-backed key/value store for parsed LLM responses
+
+    With enabled=False every lookup misses and nothing is written, which
+    gives uncached timings without changing the callers.
+    """
+
+    def __init__(self, path: Path, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        if not enabled:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> bytes:
+        return hashlib.blake2b(f"{model}|{prompt}".encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Prompt cache read failed: {e}")
+            return None
+
+    def set(self, key: bytes, value: Any):
+        if self._conn is None:
+            return
+        try:
+            data = json.dumps(value, ensure_ascii=False).encode()
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, data))
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Prompt cache write failed: {e}")